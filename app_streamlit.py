@@ -1,6 +1,6 @@
 import asyncio
 import streamlit as st
-from research_system import ResearchSystem
+from research_system import ResearchSystem, get_shared_components
 from contextlib import asynccontextmanager
 import os
 from datetime import datetime
@@ -61,9 +61,16 @@ research_depth = st.sidebar.slider(
     help="1: Base, 2: Dettagliata, 3: Approfondita"
 )
 
+@st.cache_resource
+def load_research_components(gemini_api_key):
+    """Load the stateless components (LLM, Wikipedia tool, Gemini model) once per Gemini key."""
+    return get_shared_components(gemini_api_key)
+
 @asynccontextmanager
 async def get_research_system():
-    system = ResearchSystem()
+    # Browser, sessione HTTP e cache delle pagine sono legati all'event loop
+    # di questa esecuzione: il sistema viene creato e chiuso a ogni ricerca
+    system = ResearchSystem(**load_research_components(os.environ.get("GEMINI_API_KEY")))
     try:
         yield system
     finally:
@@ -82,7 +89,7 @@ async def run_research(query: str):
                 findings = await system.execute_web_research(plan)
                 
                 # Validate findings
-                validated = await system.validate_findings(findings)
+                validated = system.validate_findings(findings)
                 
                 # Generate output
                 results = await system.generate_output(plan, validated)
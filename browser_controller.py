@@ -1,6 +1,7 @@
 import asyncio
 import logging
 import os
+import random
 import re
 from typing import Dict, Any, List, Optional, Tuple
 from urllib.parse import urlparse
@@ -9,17 +10,37 @@ from playwright.async_api import async_playwright, Page, Browser, BrowserContext
 import trafilatura
 from gemini_integration import GeminiIntegration #Added import
 from content_analyzer import ContentAnalyzer #Added import
+from models import ResearchTask, ContentMetadata
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Flag di avvio di Chromium: niente GPU, audio e attività in background
+BROWSER_LAUNCH_ARGS = [
+    "--disable-gpu",
+    "--disable-dev-shm-usage",
+    "--disable-background-networking",
+    "--disable-renderer-backgrounding",
+    "--mute-audio",
+    "--no-sandbox",
+]
+# Risorse non necessarie all'estrazione del testo
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media", "stylesheet", "other"})
+# Domini di analytics/tracking bloccati
+BLOCKED_DOMAINS_RE = re.compile(r"(?:^|\.)(?:google-analytics\.com|doubleclick\.net|googletagmanager\.com)$")
+
+
 class BrowserController:
     """Controller for semantic web browsing using Playwright and Gemini."""
 
     def __init__(self):
         self.browser = None
         self.context = None
+        # Istanza Playwright avviata da initialize() (None se fornita dall'esterno)
+        self._playwright = None
+        # True se il contesto blocca immagini, font, media, CSS e analytics
+        self.block_resources = False
         self.gemini = GeminiIntegration()
         self.analyzer = ContentAnalyzer()
 
@@ -29,18 +50,42 @@ class BrowserController:
         'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36'
     ]
 
-    async def initialize(self) -> None:
-        """Initialize browser with anti-detection."""
-        import random
-        playwright = await async_playwright().start()
-        self.browser = await playwright.chromium.launch(headless=True)
+    async def initialize(self, playwright=None, block_resources: bool = False) -> None:
+        """
+        Initialize browser with anti-detection.
+        
+        Args:
+            playwright: An already started Playwright instance to reuse; if
+                None a new one is started and stopped again by close()
+            block_resources: Block images, fonts, media, CSS and analytics on
+                the whole context. Faster for text extraction, but screenshots
+                and image analysis (semantic_browse) then see an unstyled page
+        """
+        if playwright is None:
+            playwright = self._playwright = await async_playwright().start()
+        self.browser = await playwright.chromium.launch(headless=True, args=BROWSER_LAUNCH_ARGS)
         self.context = await self.browser.new_context(
-            viewport={'width': random.randint(1024, 1920), 'height': random.randint(768, 1080)},
+            viewport={'width': 1280, 'height': 720},
+            device_scale_factor=1,
             user_agent=random.choice(self.USER_AGENTS),
             locale='it-IT'
         )
+        self.block_resources = block_resources
+        if block_resources:
+            # Blocca immagini, font, media, CSS e analytics su tutto il contesto
+            await self.context.route("**/*", self._block_heavy_resources)
         logger.debug("Browser initialized")
 
+    @staticmethod
+    async def _block_heavy_resources(route) -> None:
+        """Abort requests for heavy resources and analytics domains."""
+        request = route.request
+        if request.resource_type in BLOCKED_RESOURCE_TYPES or \
+           BLOCKED_DOMAINS_RE.search(urlparse(request.url).hostname or ""):
+            await route.abort()
+        else:
+            await route.continue_()
+
     async def analyze_visual_content(self, page: Page) -> Dict[str, Any]:
         """Analyze visual content using Gemini Vision."""
         try:
@@ -78,8 +123,13 @@ class BrowserController:
         if not self.context:
             await self.initialize()
 
+        page = None
         try:
             page = await self.context.new_page()
+            if self.block_resources:
+                # Screenshot e analisi delle immagini richiedono la pagina
+                # completa: continue_() sulla pagina scavalca il blocco del contesto
+                await page.route("**/*", lambda route: route.continue_())
             await page.goto(url, wait_until='networkidle')
 
             # Extract text content
@@ -206,29 +256,35 @@ class BrowserController:
             await self.context.close()
         if self.browser:
             await self.browser.close()
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
     
-    PROXY_LIST = os.environ.get("PROXY_LIST", "").split(",")  # Lista di proxy in formato user:pass@host:port
+    PROXY_LIST = [p for p in os.environ.get("PROXY_LIST", "").split(",") if p]  # Lista di proxy in formato user:pass@host:port
     MIN_DELAY = 2  # Secondi minimi tra le richieste
     MAX_DELAY = 5  # Secondi massimi tra le richieste
     
-    async def open_url(self, url: str) -> Tuple[Page, bool]:
+    async def open_url(self, url: str, wait_until: str = 'networkidle') -> Tuple[Page, bool]:
         """
         Open a URL in a new page with anti-detection measures.
         
         Args:
             url: The URL to open
+            wait_until: Playwright load state to wait for ('networkidle',
+                'load', 'domcontentloaded', 'commit')
             
         Returns:
             A tuple of (Page object, success boolean)
         """
         if not self.context:
-            await self.initialize()
+            await self.initialize(block_resources=True)
             
         logger.info(f"Opening URL: {url}")
         
         try:
-            # Random delay tra le richieste
-            await asyncio.sleep(random.uniform(self.MIN_DELAY, self.MAX_DELAY))
+            # Random delay tra le richieste (disattivabile con MAX_DELAY = 0)
+            if self.MAX_DELAY > 0:
+                await asyncio.sleep(random.uniform(self.MIN_DELAY, self.MAX_DELAY))
             
             # Rotazione proxy se disponibili
             if self.PROXY_LIST:
@@ -247,7 +303,7 @@ class BrowserController:
             # Intercetta e gestisci i CAPTCHA
             await page.route('**/*', lambda route: self._handle_captcha(route))
             
-            response = await page.goto(url, wait_until='networkidle', timeout=30000)
+            response = await page.goto(url, wait_until=wait_until, timeout=30000)
             
             if not response:
                 logger.error(f"Failed to load {url}: No response")
@@ -564,7 +620,7 @@ class BrowserController:
         logger.info(f"Starting browsing task: {task.task_id}")
         
         if not self.context:
-            await self.initialize()
+            await self.initialize(block_resources=True)
         
         results = {
             "task_id": str(task.task_id),
@@ -618,4 +674,5 @@ class BrowserController:
 
     async def _handle_captcha(self, route):
         # Placeholder for captcha handling (implementation needed)
-        await route.continue_()
\ No newline at end of file
+        # fallback() lascia proseguire la richiesta verso il blocco risorse del contesto
+        await route.fallback()
\ No newline at end of file
@@ -26,13 +26,10 @@ from pydantic import BaseModel, Field
 try:
     from playwright.async_api import async_playwright, Page, Browser
     # Verifica che il browser sia disponibile
-    import subprocess
-    try:
-        # Questo è un check semplificato e potrebbe non funzionare in tutti gli ambienti
-        subprocess.run(["which", "chromium"], check=True, capture_output=True)
-        browser_available = True
-    except (subprocess.SubprocessError, FileNotFoundError):
-        browser_available = False
+    import shutil
+    # Questo è un check semplificato e potrebbe non funzionare in tutti gli ambienti
+    browser_available = shutil.which("chromium") is not None
+    if not browser_available:
         logging.warning("Browser Chromium non trovato. La navigazione web sarà simulata.")
     playwright_available = True
 except ImportError:
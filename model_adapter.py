@@ -7,11 +7,14 @@ Questo modulo gestisce:
 """
 
 import os
+import asyncio
 import logging
 import json
 import subprocess
+import aiohttp
 import requests
-from typing import Dict, Any, List, Optional, Union, Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Union, Callable, AsyncIterator
 import time
 
 # Per Gemini
@@ -135,6 +138,64 @@ class OllamaClient:
             logger.error(f"Errore nella generazione con Ollama: {str(e)}")
             return {"error": str(e), "response": None}
 
+    @staticmethod
+    async def agenerate_stream(
+        prompt: str, 
+        model: str = OLLAMA_DEEPSEEK_MODEL, 
+        temperature: float = 0.7, 
+        max_tokens: int = 2048
+    ) -> AsyncIterator[str]:
+        """
+        Genera una risposta in streaming: restituisce i frammenti di testo man
+        mano che Ollama li produce (una riga NDJSON per frammento).
+        
+        Chiudere il generatore prima della fine chiude anche la connessione HTTP,
+        interrompendo la generazione lato server.
+
+        Args:
+            prompt: Il prompt da inviare al modello
+            model: Il nome del modello Ollama da usare
+            temperature: Temperatura per la generazione
+            max_tokens: Numero massimo di token da generare
+
+        Yields:
+            Frammenti di testo della risposta
+
+        Raises:
+            RuntimeError: Se la richiesta a Ollama fallisce
+        """
+        data = {
+            "model": model,
+            "prompt": prompt,
+            "stream": True,
+            "options": {
+                "temperature": temperature,
+                "num_predict": max_tokens
+            }
+        }
+
+        timeout = aiohttp.ClientTimeout(total=60)  # Timeout più lungo per la generazione
+        try:
+            async with aiohttp.ClientSession(timeout=timeout) as session:
+                async with session.post(f"{OLLAMA_BASE_URL}/api/generate", json=data) as response:
+                    if response.status != 200:
+                        text = await response.text()
+                        logger.error(f"Errore Ollama API: {response.status} - {text}")
+                        raise RuntimeError(f"Errore API: {response.status}")
+                    async for line in response.content:
+                        if not line.strip():
+                            continue
+                        part = json.loads(line)
+                        if part.get("error"):
+                            raise RuntimeError(part["error"])
+                        if part.get("response"):
+                            yield part["response"]
+                        if part.get("done"):
+                            break
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            logger.error(f"Errore nella generazione con Ollama: {str(e)}")
+            raise RuntimeError(str(e)) from e
+
 class GeminiClient:
     """Client per interagire con Google Gemini API."""
 
@@ -243,13 +304,19 @@ class ModelAdapter:
 
     def __init__(self):
         """Inizializza l'adapter e verifica la disponibilità di Ollama."""
-        self.ollama_available = OllamaClient.is_available()
+        # Le due chiamate HTTP a Ollama sono indipendenti: eseguile in parallelo
+        # così l'avvio attende al massimo un solo timeout
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            available_future = executor.submit(OllamaClient.is_available)
+            models_future = executor.submit(OllamaClient.list_models)
+            self.ollama_available = available_future.result()
+            self.ollama_models = models_future.result() if self.ollama_available else []
         self.gemini_available = GeminiClient.is_configured()
 
         # Logging dello stato
         if self.ollama_available:
             logger.info("Ollama è disponibile. Utilizzo DeepSeek via Ollama.")
-            logger.info(f"Modelli disponibili: {OllamaClient.list_models()}")
+            logger.info(f"Modelli disponibili: {self.ollama_models}")
         else:
             logger.info("Ollama non è disponibile. Verrà utilizzato Gemini come fallback.")
 
@@ -344,6 +411,63 @@ class ModelAdapter:
             )
             return result
 
+    async def generate_stream(
+        self, 
+        prompt: str, 
+        task_type: str,
+        temperature: float = 0.7,
+        max_tokens: int = 2048
+    ) -> AsyncIterator[str]:
+        """
+        Genera una risposta in streaming, frammento per frammento.
+        
+        Con Ollama i frammenti arrivano man mano; se Ollama fallisce prima di
+        produrre testo, o se il task usa Gemini, l'intera risposta viene
+        restituita come unico frammento.
+
+        Args:
+            prompt: Il prompt da inviare al modello
+            task_type: Tipo di task (planner, validator, generator, executor)
+            temperature: Temperatura per la generazione
+            max_tokens: Numero massimo di token da generare
+
+        Yields:
+            Frammenti di testo della risposta
+
+        Raises:
+            RuntimeError: Se nessun modello riesce a generare la risposta
+        """
+        model = self.get_model_for_task(task_type)
+
+        if model == "ollama":
+            started = False
+            try:
+                async for chunk in OllamaClient.agenerate_stream(
+                    prompt=f"[INSTRUCTION]\n{prompt}\n[/INSTRUCTION]",
+                    model=OLLAMA_DEEPSEEK_MODEL,
+                    temperature=temperature,
+                    max_tokens=max_tokens
+                ):
+                    started = True
+                    yield chunk
+                return
+            except RuntimeError as e:
+                # A stream già iniziato non si può ripartire da capo con Gemini
+                if started or not self.gemini_available:
+                    raise
+                logger.warning(f"Errore con Ollama: {str(e)}. Provo con Gemini.")
+
+        # Gemini ha solo un client sincrono: eseguilo fuori dall'event loop
+        result = await asyncio.to_thread(
+            GeminiClient.generate,
+            prompt=prompt,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        if result.get("error"):
+            raise RuntimeError(result["error"])
+        yield result.get("response") or ""
+
     def check_ollama_installation(self) -> Dict[str, Any]:
         """
         Verifica lo stato dell'installazione di Ollama.
@@ -359,7 +483,7 @@ class ModelAdapter:
         }
 
         if self.ollama_available:
-            models = OllamaClient.list_models()
+            models = self.ollama_models
             result["models_available"] = models
             result["deepseek_available"] = any("deepseek" in model.lower() for model in models)
 
@@ -2,10 +2,11 @@ import asyncio
 import os
 import logging
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from prefect import flow, task, get_run_logger
-from prefect.tasks import task_input_hash
+from prefect.tasks import task_input_hash, NO_CACHE
 from prefect.deployments import Deployment
+from playwright.async_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
 from research_system import ResearchSystem, ResearchPlan, ContentFinding
 
 # Configure logging
@@ -19,11 +20,31 @@ async def create_research_plan_task(query: str) -> ResearchPlan:
     log.info(f"Creating research plan for: {query}")
     
     system = ResearchSystem()
-    plan = await system.create_research_plan(query)
+    try:
+        plan = await system.create_research_plan(query)
+    finally:
+        await system.close()
     
     log.info(f"Research plan created with {len(plan.questions)} questions")
     return plan
 
+def is_transient_fetch_error(task, task_run, state) -> bool:
+    """Retry condition: only timeouts and network errors are worth another attempt."""
+    error = state.data
+    if isinstance(error, (TimeoutError, OSError, PlaywrightTimeoutError)):
+        return True
+    # Playwright reports network failures as net::ERR_* navigation errors;
+    # anything else, e.g. the ValueError for unsupported content, would fail
+    # the same way again
+    if isinstance(error, PlaywrightError):
+        return "net::" in error.message
+    return False
+
+@task(retries=2, retry_delay_seconds=1, cache_policy=NO_CACHE, retry_condition_fn=is_transient_fetch_error)
+async def fetch_source_task(system: ResearchSystem, source: str) -> Tuple[str, str]:
+    """Task to fetch a single source; retried so transient timeouts do not fail the flow."""
+    return await system.fetch_source(source)
+
 @task
 async def execute_web_research_task(plan: ResearchPlan) -> List[ContentFinding]:
     """Task to execute web research."""
@@ -33,24 +54,27 @@ async def execute_web_research_task(plan: ResearchPlan) -> List[ContentFinding]:
     system = ResearchSystem()
     try:
         await system.initialize_browser()
-        findings = await system.execute_web_research(plan)
+        
+        # Fan out one retried task per source. They share the browser, so they
+        # run concurrently on this task's event loop rather than via .map()
+        sources = system.plan_sources(plan)
+        results = await asyncio.gather(
+            *[fetch_source_task(system, source) for source in sources],
+            return_exceptions=True
+        )
+        pages = {}
+        for source, result in zip(sources, results):
+            if isinstance(result, Exception):
+                log.error(f"Error researching {source}: {str(result)}")
+            else:
+                pages[source] = result
+        
+        findings = await system.analyze_sources(plan, pages)
         log.info(f"Web research completed with {len(findings)} findings")
         return findings
     finally:
         await system.close_browser()
 
-@task
-async def validate_findings_task(findings: List[ContentFinding]) -> List[ContentFinding]:
-    """Task to validate findings."""
-    log = get_run_logger()
-    log.info(f"Validating {len(findings)} findings")
-    
-    system = ResearchSystem()
-    validated = await system.validate_findings(findings)
-    
-    log.info(f"Validation complete: {len(validated)} valid findings")
-    return validated
-
 @task
 async def generate_output_task(plan: ResearchPlan, findings: List[ContentFinding]) -> Dict[str, Any]:
     """Task to generate the final output."""
@@ -58,7 +82,10 @@ async def generate_output_task(plan: ResearchPlan, findings: List[ContentFinding
     log.info(f"Generating final output for {len(findings)} findings")
     
     system = ResearchSystem()
-    output = await system.generate_output(plan, findings)
+    try:
+        output = await system.generate_output(plan, findings)
+    finally:
+        await system.close()
     
     log.info(f"Output generated with summary length: {len(output.summary)}")
     return output.dict()
@@ -72,7 +99,9 @@ async def research_flow(query: str) -> Dict[str, Any]:
     # Execute tasks in sequence
     plan = await create_research_plan_task(query)
     findings = await execute_web_research_task(plan)
-    validated_findings = await validate_findings_task(findings)
+    # Validation is a cheap in-memory filter: no task needed
+    validated_findings = ResearchSystem.validate_findings(findings)
+    log.info(f"Validation complete: {len(validated_findings)} valid findings")
     output = await generate_output_task(plan, validated_findings)
     
     log.info("Research flow completed successfully")
@@ -140,7 +140,7 @@ class ResearchOrchestrator:
         logger.info(f"Validazione risultato per task: {task.task_id}")
         
         # Esegue la validazione
-        validation = self.validator.validate_content(
+        validation = await self.validator.validate_content(
             task_id=task.task_id,
             content_id=f"result_{task.task_id}",
             question=task.question,
@@ -2,26 +2,74 @@ import logging
 import asyncio
 import os
 import json
-from typing import List, Dict, Any, Optional
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
 
-from langchain_community.tools import DuckDuckGoSearchRun, WikipediaQueryRun
-from langchain_community.utilities import DuckDuckGoSearchAPIWrapper, WikipediaAPIWrapper
+import aiohttp
+import lxml.html
+import requests
+
+from langchain_community.tools import WikipediaQueryRun
+from langchain_community.utilities import WikipediaAPIWrapper
 from langchain_ollama import ChatOllama
 
 from langchain.prompts import ChatPromptTemplate
 from langchain.output_parsers import PydanticOutputParser
 import google.generativeai as genai
 from playwright.async_api import async_playwright
-from prefect import flow, task
-from prefect.tasks import NO_CACHE
-from prefect.tasks import NO_CACHE
+from prefect import flow
 import streamlit as st
-from pydantic import BaseModel, Field
+from pydantic_core import from_json
+from pydantic import BaseModel, Field, RootModel, ValidationError
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+    logging.warning("orjson non è disponibile. Verrà utilizzato il modulo json standard.")
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Configurazione Ollama
+OLLAMA_BASE_URL = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")
+OLLAMA_MODEL = "deepseek-r1:7b"
+
+# Numero massimo di pagine aperte contemporaneamente durante la ricerca web
+MAX_CONCURRENT_PAGES = 50
+
+# Endpoint HTML di DuckDuckGo (non richiede JavaScript)
+DUCKDUCKGO_HTML_URL = "https://html.duckduckgo.com/html/"
+
+# Numero massimo di caratteri di testo visibile inviati a Gemini per ogni pagina
+MAX_ANALYSIS_CHARS = 20000
+
+# Lunghezza oltre la quale lo streaming dell'analisi di una singola fonte
+# viene interrotto (la sintesi viene comunque troncata a 500 caratteri)
+MAX_ANALYSIS_RESPONSE_CHARS = 4000
+
+# Numero di fonti analizzate da Gemini in una singola richiesta e caratteri
+# di testo inviati per ciascuna fonte del batch
+GEMINI_BATCH_SIZE = 5
+BATCH_SOURCE_CHARS = 10000
+
+# Numero massimo di pagine mantenute in cache per sessione
+PAGE_CACHE_SIZE = 256
+
+# Opzioni di avvio di Chromium per ridurre i tempi di start-up in headless
+BROWSER_LAUNCH_ARGS = ["--disable-dev-shm-usage", "--no-sandbox", "--disable-gpu"]
+
+# Estensioni di documenti binari che non vengono aperti nel browser
+BINARY_EXTENSIONS = (".pdf", ".zip", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx")
+
+# Tipi di risorse non necessari per l'estrazione del testo
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media", "stylesheet"}
+
 # Define data models
 class ResearchQuestion(BaseModel):
     """Model representing a research question."""
@@ -55,7 +103,15 @@ class ContentFinding(BaseModel):
     key_points: List[KeyPoint] = Field(default_factory=list)
     summary: Optional[str] = None
     confidence: float = Field(ge=0.0, le=1.0, default=0.0)
-    raw_content: Optional[str] = None
+    raw_content: Optional[str] = Field(default=None, exclude=True)  # Never serialized
+
+class SourceAnalysis(BaseModel):
+    """Model representing Gemini's analysis of a single source in a batch."""
+    key_points: List[str] = Field(default_factory=list)
+    summary: str = ""
+
+class ResearchBatchOutput(RootModel[Dict[str, SourceAnalysis]]):
+    """Model representing a batched analysis, keyed by source id (S1, S2, ...)."""
 
 class ResearchOutput(BaseModel):
     """Model representing the complete output of a research task."""
@@ -65,23 +121,156 @@ class ResearchOutput(BaseModel):
     created_at: str
 
 
-class ResearchSystem:
-    def __init__(self):
-        """Initialize the research system components."""
-        # Initialize DeepSeek Local components via Ollama
-        self.planner = ChatOllama(model="deepseek-r1:7b")
-        self.validator = ChatOllama(model="deepseek-r1:7b")
-        self.generator = ChatOllama(model="deepseek-r1:7b")
-
-        # Initialize search tools
-        self.search_tool = DuckDuckGoSearchRun(api_wrapper=DuckDuckGoSearchAPIWrapper())
-        self.wiki_tool = WikipediaQueryRun(api_wrapper=WikipediaAPIWrapper())
-        
-        # Initialize Google Gemini components
-        gemini_api_key = os.environ.get("GEMINI_API_KEY")
-        if gemini_api_key:
+# Istruzioni di formato per il piano di ricerca - ESCAPE CURLY BRACES
+PLAN_FORMAT_INSTRUCTIONS = """
+La tua risposta deve essere un oggetto JSON valido con la seguente struttura:
+{{
+"objective": "L'obiettivo principale della ricerca come stringa",
+"questions": [
+    {{
+    "question": "Domanda di ricerca specifica e dettagliata",
+    "importance": 3
+    }}
+],
+"depth": 2
+}}
+
+Note:
+- "objective" deve essere una semplice stringa che descrive l'obiettivo generale
+- "questions" deve essere un array di 3-5 domande ben formulate
+- Ogni domanda deve essere specifica, dettagliata e focalizzata su un aspetto particolare
+- Ogni domanda deve avere "question" e "importance" (intero da 1-5)
+- "depth" deve essere un intero da 1-3 (1=superficiale, 3=approfondita)
+- Non includere il campo "sources", verrà aggiunto automaticamente dal sistema
+"""
+
+# Prompt per la pianificazione della ricerca
+PLANNING_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """Sei un esperto pianificatore di ricerche che crea piani strutturati.
+    Data una query di ricerca, il tuo compito è sviluppare un piano dettagliato con domande specifiche.
+    Le tue domande guideranno una ricerca approfondita su Internet.
+    
+    Rispondi in italiano e formula 3-5 domande chiave che:
+    1. Coprino diversi aspetti rilevanti della query
+    2. Siano sufficientemente specifiche da guidare una ricerca mirata
+    3. Affrontino sia aspetti generali che dettagli specifici
+    4. Si prestino a trovare informazioni fattuali e verificabili
+    5. Siano formulate in modo neutrale e oggettivo
+    
+    IMPORTANTE: Non includere fonti o URL nel piano - le risorse verranno identificate automaticamente 
+    in una fase successiva tramite un sistema di ricerca separato.
+    """),
+    ("human", "Query di ricerca: {query}\n\nCrea un piano di ricerca per questa query con domande mirate. " + PLAN_FORMAT_INSTRUCTIONS)
+])
+
+# Prompt per la sintesi finale dei risultati
+SUMMARY_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are a research synthesis expert. Create a comprehensive summary from the collected findings."),
+    ("human", "Research objective: {objective}\n\nFindings:\n{findings}\n\nCreate a comprehensive summary.")
+])
+
+# Prompt per l'analisi di più fonti in una singola richiesta a Gemini
+BATCH_ANALYSIS_PROMPT = """For each source below, extract the key points relevant to the following question.
+Question: {question}
+
+Each source is labelled with a short id such as [S1].
+Return only a JSON object keyed by source id, without the brackets:
+{{"S1": {{"key_points": ["..."], "summary": "..."}}}}
+
+"""
+
+PLAN_PARSER = PydanticOutputParser(pydantic_object=ResearchPlan)
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _json_slice(content: str) -> str:
+    """Return the text between the first '{' and the last '}' of an LLM response."""
+    start = content.find("{")
+    if start < 0:
+        return content
+    return content[start:content.rfind("}") + 1]
+
+
+def _parse_llm_json(content: str) -> Any:
+    """
+    Parse the JSON object contained in an LLM response.
+
+    The slice between the outer braces is parsed once; only if that fails
+    (a stray '}' in trailing prose, or a response cut off mid-object) is
+    the first object recovered from the raw content.
+    """
+    try:
+        return _json_loads(_json_slice(content))
+    except ValueError:
+        start = max(content.find("{"), 0)
+        try:
+            return _JSON_DECODER.raw_decode(content, start)[0]
+        except ValueError:
+            return from_json(content[start:], allow_partial=True)
+
+
+# Componenti pesanti condivisi da tutte le istanze di ResearchSystem.
+# Streamlit riesegue lo script a ogni interazione, quindi vengono creati
+# una sola volta per processo.
+_components_lock = threading.Lock()
+_shared_llm: Optional[ChatOllama] = None
+_shared_wiki_tool: Optional[WikipediaQueryRun] = None
+_shared_gemini_models: Dict[str, Any] = {}
+
+
+def _warmup_ollama():
+    """Ask Ollama for a single token so the model is resident in memory."""
+    try:
+        requests.post(
+            f"{OLLAMA_BASE_URL}/api/generate",
+            json={
+                "model": OLLAMA_MODEL,
+                "prompt": " ",
+                "stream": False,
+                "options": {"num_predict": 1}
+            },
+            timeout=120
+        )
+        logger.info(f"Ollama model {OLLAMA_MODEL} warmed up")
+    except Exception as e:
+        logger.warning(f"Ollama warmup failed: {str(e)}")
+
+
+def _get_shared_llm() -> ChatOllama:
+    """Return the process-wide Ollama client, creating it on first use."""
+    global _shared_llm
+    with _components_lock:
+        if _shared_llm is None:
+            _shared_llm = ChatOllama(model=OLLAMA_MODEL, base_url=OLLAMA_BASE_URL)
+            # Load the model weights in the background so the first real
+            # request does not pay the cold-start latency
+            threading.Thread(target=_warmup_ollama, daemon=True).start()
+        return _shared_llm
+
+
+def _get_shared_wiki_tool() -> WikipediaQueryRun:
+    """Return the process-wide Wikipedia tool."""
+    global _shared_wiki_tool
+    with _components_lock:
+        if _shared_wiki_tool is None:
+            _shared_wiki_tool = WikipediaQueryRun(api_wrapper=WikipediaAPIWrapper())
+        return _shared_wiki_tool
+
+
+def _get_shared_gemini_model(gemini_api_key: Optional[str] = None):
+    """Return the Gemini model for the given key (default GEMINI_API_KEY), or None if unset."""
+    # The key can be entered from the Streamlit sidebar after start-up,
+    # so the model is cached per key rather than once per process
+    gemini_api_key = gemini_api_key or os.environ.get("GEMINI_API_KEY")
+    if not gemini_api_key:
+        logger.warning("GEMINI_API_KEY not found. Gemini functionality will be disabled.")
+        return None
+
+    with _components_lock:
+        if gemini_api_key not in _shared_gemini_models:
             genai.configure(api_key=gemini_api_key)
-            self.research_engine = genai.GenerativeModel(
+            _shared_gemini_models[gemini_api_key] = genai.GenerativeModel(
                 #model_name="gemini-1.5-pro",
                 model_name="gemma-3-27b-it",
                 generation_config={
@@ -94,38 +283,85 @@ class ResearchSystem:
                     "HATE_SPEECH": "BLOCK_NONE"
                 }
             )
-        else:
-            logger.warning("GEMINI_API_KEY not found. Gemini functionality will be disabled.")
-            self.research_engine = None
+        return _shared_gemini_models[gemini_api_key]
+
+
+def get_shared_components(gemini_api_key: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Return the stateless components shared by all ResearchSystem instances.
+
+    The result can be passed as keyword arguments to ResearchSystem; the
+    browser, HTTP session and page cache stay per instance.
+    """
+    return {
+        "llm": _get_shared_llm(),
+        "wiki_tool": _get_shared_wiki_tool(),
+        "research_engine": _get_shared_gemini_model(gemini_api_key)
+    }
+
+
+class ResearchSystem:
+    def __init__(self, llm=None, wiki_tool=None, research_engine=None):
+        """
+        Initialize the research system components.
+
+        The LLM, Wikipedia tool and Gemini model default to process-wide
+        shared instances; pass them explicitly to override (e.g. in tests).
+        """
+        # Initialize DeepSeek Local components via Ollama.
+        # Planner, validator and generator all use the same model, so they
+        # share a single client.
+        self.llm = llm or _get_shared_llm()
+        self.planner = self.llm
+        self.validator = self.llm
+        self.generator = self.llm
+
+        # Initialize search tools. DuckDuckGo is queried directly through a
+        # pooled HTTP session, created lazily inside the running event loop
+        self.wiki_tool = wiki_tool or _get_shared_wiki_tool()
+        self._http: Optional[aiohttp.ClientSession] = None
+        
+        # Initialize Google Gemini components
+        self.research_engine = research_engine or _get_shared_gemini_model()
             
         # Initialize infrastructure components
+        self._playwright = None
         self.browser = None
-        self.plan_parser = PydanticOutputParser(pydantic_object=ResearchPlan)
+        self.context = None
+        self._page_pool: Optional[asyncio.Queue] = None
+        self._page_slots: Optional[asyncio.Semaphore] = None
+        self._page_cache: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+        self.plan_parser = PLAN_PARSER
 
-    async def analyze_with_gemini_rate_limited(self, content, question, max_retries=3, retry_delay=5):
+    def _stream_gemini(self, prompt, max_chars=None):
+        """Consume a streamed Gemini response, stopping early after max_chars."""
+        chunks = []
+        total = 0
+        for chunk in self.research_engine.generate_content([prompt], stream=True):
+            chunks.append(chunk.text)
+            total += len(chunk.text)
+            if max_chars and total >= max_chars:
+                break
+        return "".join(chunks)
+
+    async def _generate_with_gemini(self, prompt, max_retries=3, retry_delay=5, max_chars=None):
         """
-        Analizza i contenuti con Gemini con gestione dei limiti di quota.
+        Invia un prompt a Gemini con gestione dei limiti di quota.
         
         Args:
-            content: Il contenuto da analizzare
-            question: La domanda di ricerca
+            prompt: Il prompt da inviare
             max_retries: Numero massimo di tentativi
             retry_delay: Tempo di attesa tra i tentativi in secondi
+            max_chars: Se indicato, interrompe lo streaming dopo questo numero di caratteri
             
         Returns:
-            Il testo dell'analisi o None in caso di errore
+            Il testo della risposta o None in caso di errore
         """
-        import time
-        
         for attempt in range(max_retries):
             try:
-                gemini_response = self.research_engine.generate_content([
-                    "Extract the key information from this webpage content relevant to the following question. "
-                    f"Question: {question}\n\n"
-                    f"Content: {content[:30000]}",  # Ridotto a 30K per evitare problemi di quota
-                ])
-                
-                return gemini_response.text
+                # The SDK is synchronous: stream in a worker thread so the
+                # concurrent fetches and analyses keep running
+                return await asyncio.to_thread(self._stream_gemini, prompt, max_chars)
                 
             except Exception as e:
                 error_message = str(e)
@@ -143,6 +379,32 @@ class ResearchSystem:
                     logger.error(f"Non-quota error with Gemini: {error_message}")
                     break
         
+        return None
+
+    async def analyze_with_gemini_rate_limited(self, content, question, max_retries=3, retry_delay=5):
+        """
+        Analizza i contenuti con Gemini con gestione dei limiti di quota.
+        
+        Args:
+            content: Il contenuto da analizzare
+            question: La domanda di ricerca
+            max_retries: Numero massimo di tentativi
+            retry_delay: Tempo di attesa tra i tentativi in secondi
+            
+        Returns:
+            Il testo dell'analisi o None in caso di errore
+        """
+        analysis = await self._generate_with_gemini(
+            "Extract the key information from this webpage content relevant to the following question. "
+            f"Question: {question}\n\n"
+            f"Content: {content[:30000]}",  # Ridotto a 30K per evitare problemi di quota
+            max_retries=max_retries,
+            retry_delay=retry_delay,
+            max_chars=MAX_ANALYSIS_RESPONSE_CHARS
+        )
+        if analysis is not None:
+            return analysis
+        
         # Fallback al modello locale se Gemini non funziona
         try:
             # Versione molto semplificata senza template complessi per evitare problemi con le parentesi graffe
@@ -154,10 +416,80 @@ class ResearchSystem:
         except Exception as e:
             logger.error(f"Fallback analysis also failed: {str(e)}")
             return "Non è stato possibile analizzare il contenuto a causa di errori tecnici."
+
+    async def analyze_sources_batch(self, question: str, batch: List[Tuple[str, str]]) -> Dict[str, SourceAnalysis]:
+        """
+        Analizza più fonti con una sola richiesta a Gemini.
+        
+        Args:
+            question: La domanda di ricerca
+            batch: Lista di coppie (url, testo) da analizzare
+            
+        Returns:
+            Dizionario url -> analisi; vuoto se la risposta non è un JSON valido
+        """
+        # Id brevi al posto degli URL: il modello non deve ricopiare URL lunghi
+        # alla lettera perché la risposta si possa ricondurre alla fonte
+        ids = {f"S{i}": url for i, (url, _) in enumerate(batch, 1)}
+        prompt = BATCH_ANALYSIS_PROMPT.format(question=question) + "\n---\n".join(
+            f"[{source_id}]\n{text[:BATCH_SOURCE_CHARS]}"
+            for source_id, (_, text) in zip(ids, batch)
+        )
+        response_text = await self._generate_with_gemini(prompt)
+        if not response_text or "{" not in response_text:
+            return {}
+        
+        try:
+            analyses = ResearchBatchOutput.model_validate(_parse_llm_json(response_text)).root
+        except ValueError as e:
+            logger.warning(f"Could not parse batched Gemini analysis: {str(e)}")
+            return {}
+        
+        urls = set(ids.values())
+        results = {}
+        for key, analysis in analyses.items():
+            # Tollera "[S1]" o "s1"; un URL usato come chiave resta valido
+            url = ids.get(key.strip(" []").upper(), key)
+            if url in urls:
+                results[url] = analysis
+        return results
     
+    async def _get_http_session(self) -> aiohttp.ClientSession:
+        """Return the shared HTTP session, reusing connections across searches."""
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300),
+                headers={"User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36"}
+            )
+        return self._http
+
+    async def _search_duckduckgo(self, query: str) -> List[str]:
+        """
+        Cerca su DuckDuckGo e restituisce gli URL dei risultati.
+        
+        Args:
+            query: La query di ricerca
+            
+        Returns:
+            Lista di URL nell'ordine dei risultati
+        """
+        http = await self._get_http_session()
+        async with http.get(DUCKDUCKGO_HTML_URL, params={"q": query}) as response:
+            response.raise_for_status()
+            html = await response.text()
+
+        urls = []
+        for href in lxml.html.fromstring(html).xpath('//a[contains(@class, "result__a")]/@href'):
+            # I risultati puntano al redirect di DuckDuckGo: l'URL reale è nel parametro uddg
+            parsed = urlparse(href)
+            target = parse_qs(parsed.query).get("uddg", [href])[0]
+            if target.startswith("http"):
+                urls.append(target)
+        return urls
+
     async def perform_search(self, query: str) -> List[str]:
         """
-        Esegue ricerche utilizzando tool di LangChain e restituisce risultati pertinenti.
+        Esegue ricerche su DuckDuckGo e Wikipedia e restituisce risultati pertinenti.
         
         Args:
             query: La query di ricerca
@@ -168,26 +500,18 @@ class ResearchSystem:
         logger.info(f"Performing search for: {query}")
         
         try:
-            # Esegui ricerca con DuckDuckGo
-            search_results = self.search_tool.run(query)
-            
-            # Esegui ricerca su Wikipedia
-            wiki_results = self.wiki_tool.run(query)
-            
-            # Estrai URL dai risultati di DuckDuckGo
-            # Il formato di output di DuckDuckGo è un testo con URL e snippet
-            # Dobbiamo estrarre gli URL
-            import re
-            
-            # Pattern regex per trovare URL
-            url_pattern = re.compile(r'https?://[^\s\)]+')
-            urls = url_pattern.findall(search_results)
+            # Esegui in parallelo le ricerche su DuckDuckGo e Wikipedia
+            # (il tool di LangChain è sincrono, quindi gira in un thread separato)
+            urls, wiki_results = await asyncio.gather(
+                self._search_duckduckgo(query),
+                asyncio.to_thread(self.wiki_tool.run, query)
+            )
             
             # Aggiungi una versione URL-friendly della query di Wikipedia
             urls.append(f"https://it.wikipedia.org/wiki/{query.replace(' ', '_')}")
             
-            # Limita a massimo 5 URL
-            return urls[:5]
+            # Rimuovi i duplicati mantenendo l'ordine e limita a massimo 5 URL
+            return list(dict.fromkeys(urls))[:5]
             
         except Exception as e:
             logger.error(f"Error during search: {str(e)}")
@@ -196,16 +520,84 @@ class ResearchSystem:
         
     async def initialize_browser(self):
         """Initialize the browser controller."""
-        playwright = await async_playwright().start()
-        self.browser = await playwright.chromium.launch(headless=True)
-        self.context = await self.browser.new_context()
+        self._playwright = await async_playwright().start()
+        self.browser = await self._playwright.chromium.launch(headless=True, args=BROWSER_LAUNCH_ARGS)
+        await self._new_context()
         logger.info("Browser initialized")
-        
+
+    async def _new_context(self):
+        """Open a fresh browser context with an empty page pool."""
+        self.context = await self.browser.new_context(viewport={"width": 1280, "height": 800})
+        await self.context.route("**/*", self._block_heavy_resources)
+        # Idle pages, plus one slot per page that exists or is being opened
+        self._page_pool = asyncio.Queue()
+        self._page_slots = asyncio.Semaphore(MAX_CONCURRENT_PAGES)
+
+    async def recycle_context(self):
+        """Replace the browser context, keeping the browser process alive."""
+        if self.context:
+            await self.context.close()
+        await self._new_context()
+        logger.info("Browser context recycled")
+
+    @staticmethod
+    async def _block_heavy_resources(route):
+        """Abort requests for resources that are not needed to read the page text."""
+        if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _acquire_page(self):
+        """Take an idle page from the pool, or open one while below MAX_CONCURRENT_PAGES."""
+        # Waiting for a free slot also bounds concurrency
+        await self._page_slots.acquire()
+        try:
+            return self._page_pool.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+        try:
+            return await self.context.new_page()
+        except BaseException:
+            # The page was never opened: give its slot back
+            self._page_slots.release()
+            raise
+
+    async def _release_page(self, page):
+        """Reset a pooled page and put it back; a page that cannot be reset is discarded."""
+        if page.context is not self.context:
+            # Page of a context that has since been recycled: its pool is gone
+            return
+        try:
+            if not page.is_closed():
+                await page.goto("about:blank")
+                self._page_pool.put_nowait(page)
+                return
+        except Exception as e:
+            logger.warning(f"Could not reset pooled page, discarding it: {str(e)}")
+            try:
+                await page.close()
+            except Exception:
+                pass
+        finally:
+            # Reused or discarded, the slot is free again; a discarded page is
+            # replaced lazily by the next _acquire_page
+            self._page_slots.release()
+
     async def close_browser(self):
         """Close the browser controller."""
         if hasattr(self, 'browser') and self.browser:
             await self.browser.close()
-        logger.info("Browser closed")
+        if self._playwright is not None:
+            await self._playwright.stop()
+        self._playwright = None
+        if self._http is not None and not self._http.closed:
+            await self._http.close()
+        self._http = None
+        self.browser = None
+        self.context = None
+        self._page_pool = None
+        self._page_slots = None
         logger.info("Browser closed")
 
     async def close(self):
@@ -216,9 +608,9 @@ class ResearchSystem:
     def fix_json_structure(self, json_data):
         """Fix common JSON structure issues from LLM responses."""
         try:
-            if isinstance(json_data, str):
+            if isinstance(json_data, (str, bytes)):
                 # Try to parse the string as JSON
-                json_data = json.loads(json_data)
+                json_data = _json_loads(json_data)
             
             # Fix objective field if it's an object instead of a string
             if isinstance(json_data.get('objective'), dict) and 'title' in json_data['objective']:
@@ -263,91 +655,43 @@ class ResearchSystem:
             logger.error(f"Error fixing JSON structure: {str(e)}")
             return json_data
         
-    @task(cache_policy=NO_CACHE)
     async def create_research_plan(self, query: str) -> ResearchPlan:
         """Create a structured research plan from a user query."""
         logger.info(f"Creating research plan for: {query}")
         
-        # Define explicit format instructions - ESCAPE CURLY BRACES
-        format_instructions = """
-        La tua risposta deve essere un oggetto JSON valido con la seguente struttura:
-        {{
-        "objective": "L'obiettivo principale della ricerca come stringa",
-        "questions": [
-            {{
-            "question": "Domanda di ricerca specifica e dettagliata",
-            "importance": 3
-            }}
-        ],
-        "depth": 2
-        }}
-        
-        Note:
-        - "objective" deve essere una semplice stringa che descrive l'obiettivo generale
-        - "questions" deve essere un array di 3-5 domande ben formulate
-        - Ogni domanda deve essere specifica, dettagliata e focalizzata su un aspetto particolare
-        - Ogni domanda deve avere "question" e "importance" (intero da 1-5)
-        - "depth" deve essere un intero da 1-3 (1=superficiale, 3=approfondita)
-        - Non includere il campo "sources", verrà aggiunto automaticamente dal sistema
-        """
-        
-        # Define the prompt for planning
-        planning_prompt = ChatPromptTemplate.from_messages([
-            ("system", """Sei un esperto pianificatore di ricerche che crea piani strutturati.
-            Data una query di ricerca, il tuo compito è sviluppare un piano dettagliato con domande specifiche.
-            Le tue domande guideranno una ricerca approfondita su Internet.
-            
-            Rispondi in italiano e formula 3-5 domande chiave che:
-            1. Coprino diversi aspetti rilevanti della query
-            2. Siano sufficientemente specifiche da guidare una ricerca mirata
-            3. Affrontino sia aspetti generali che dettagli specifici
-            4. Si prestino a trovare informazioni fattuali e verificabili
-            5. Siano formulate in modo neutrale e oggettivo
-            
-            IMPORTANTE: Non includere fonti o URL nel piano - le risorse verranno identificate automaticamente 
-            in una fase successiva tramite un sistema di ricerca separato.
-            """),
-            ("human", f"Query di ricerca: {query}\n\nCrea un piano di ricerca per questa query con domande mirate. {format_instructions}")
-        ])
-        
         try:
             # Generate the plan using DeepSeek via Ollama - without parser
-            plan_chain = planning_prompt | self.planner
-            result = await plan_chain.ainvoke({})
+            plan_chain = PLANNING_PROMPT | self.planner
+            result = await plan_chain.ainvoke({"query": query})
             
             # Extract the JSON content from the response
             content = result.content
             
-            # Look for JSON block in case the model wrapped it with other text
-            json_match = None
-            if "{" in content and "}" in content:
-                start = content.find("{")
-                end = content.rfind("}") + 1
-                json_match = content[start:end]
-            
             try:
-                if json_match:
-                    json_data = json.loads(json_match)
-                else:
-                    json_data = json.loads(content)
-                
-                # Fix common JSON structure issues
-                fixed_json = self.fix_json_structure(json_data)
+                # Parse the response once; the dict is validated as is and only
+                # repaired when the model did not emit a conformant plan
+                plan_data = _parse_llm_json(content)
+                try:
+                    research_plan = ResearchPlan.model_validate(plan_data)
+                except ValidationError:
+                    # Fix common JSON structure issues
+                    research_plan = ResearchPlan.model_validate(self.fix_json_structure(plan_data))
                 
                 # Per ogni domanda, aggiungiamo fonti basate sul risultato di ricerca
-                if "questions" in fixed_json and isinstance(fixed_json["questions"], list):
-                    for i, question in enumerate(fixed_json["questions"]):
-                        # Genera una query di ricerca basata sulla domanda
-                        search_query = f"{fixed_json['objective']} {question['question']}"
-                        
-                        # Esegui la ricerca effettiva
-                        sources = await self.perform_search(search_query)
-                        
-                        # Aggiungi le fonti alla domanda
-                        fixed_json["questions"][i]["sources"] = sources
+                # Le ricerche sono indipendenti, quindi vengono eseguite in parallelo
+                search_queries = [
+                    f"{research_plan.objective} {question.question}"
+                    for question in research_plan.questions
+                ]
+                sources_list = await asyncio.gather(
+                    *[self.perform_search(search_query) for search_query in search_queries],
+                    return_exceptions=True
+                )
+                
+                # Aggiungi le fonti alle domande
+                for question, sources in zip(research_plan.questions, sources_list):
+                    question.sources = [] if isinstance(sources, Exception) else sources
                 
-                # Now try to parse with Pydantic
-                research_plan = ResearchPlan(**fixed_json)
                 logger.info("Successfully parsed research plan")
                 return research_plan
                 
@@ -387,106 +731,191 @@ class ResearchSystem:
             )
             return fallback_plan
     
-    # Add NO_CACHE to tasks that use self or other non-serializable resources
-    @task(cache_policy=NO_CACHE)
+    @staticmethod
+    def plan_sources(plan: ResearchPlan) -> List[str]:
+        """Return the unique source URLs of a plan, in order of first appearance."""
+        # Questions often share search results, so each page is fetched only once
+        return list(dict.fromkeys(
+            source for question in plan.questions for source in question.sources
+        ))
+
+    async def fetch_source(self, source: str) -> Tuple[str, str]:
+        """
+        Fetch a single source with the shared browser.
+
+        Args:
+            source: URL of the page to read
+
+        Returns:
+            Tuple of (page title, visible page text)
+        """
+        # Pages already read in this session are served from the cache
+        if source in self._page_cache:
+            self._page_cache.move_to_end(source)
+            return self._page_cache[source]
+
+        # Binary documents have no DOM worth reading: skip them before
+        # Playwright starts downloading or rendering them
+        if urlparse(source).path.lower().endswith(BINARY_EXTENSIONS):
+            raise ValueError(f"Unsupported content type for {source}")
+
+        page = await self._acquire_page()
+        logger.info(f"Researching: {source}")
+        try:
+            # Navigate to the page: wait for the parsed DOM only, not for
+            # the network to go idle (ad-heavy pages rarely do)
+            response = await page.goto(source, wait_until="domcontentloaded", timeout=15000)
+            content_type = response.headers.get("content-type", "") if response else ""
+            if content_type and "html" not in content_type:
+                raise ValueError(f"Unsupported content type {content_type} for {source}")
+            try:
+                await page.wait_for_selector("main, article, body", timeout=5000)
+            except Exception:
+                logger.debug(f"No content container found on {source}, using DOM as is")
+
+            # Extract only the visible text: the raw HTML is mostly markup
+            page_text = await page.evaluate("() => document.body ? document.body.innerText : ''")
+            page_title = await page.title()
+        finally:
+            await self._release_page(page)
+
+        self._page_cache[source] = (page_title, page_text)
+        if len(self._page_cache) > PAGE_CACHE_SIZE:
+            self._page_cache.popitem(last=False)
+        return page_title, page_text
+
+    async def analyze_sources(self, plan: ResearchPlan, pages: Dict[str, Tuple[str, str]]) -> List[ContentFinding]:
+        """
+        Analyze fetched pages against the questions of the plan.
+
+        Args:
+            plan: The research plan
+            pages: Mapping of source URL to (page title, visible page text)
+
+        Returns:
+            List of findings, one per (question, source) pair that was analyzed
+        """
+        # Use rate-limited Gemini for content analysis if available
+        if not self.research_engine:
+            return []
+
+        async def analyze_batch(question: ResearchQuestion, batch: List[Tuple[str, str, str]]) -> List[ContentFinding]:
+            analyses = await self.analyze_sources_batch(
+                question.question,
+                [(source, page_text) for source, _, page_text in batch]
+            )
+
+            batch_findings = []
+            for source, page_title, page_text in batch:
+                analysis = analyses.get(source)
+                if analysis and (analysis.key_points or analysis.summary):
+                    points = analysis.key_points
+                    summary = analysis.summary or "\n\n".join(points)
+                else:
+                    # The source is missing from the batched answer: analyze it alone
+                    summary = await self.analyze_with_gemini_rate_limited(
+                        content=page_text[:MAX_ANALYSIS_CHARS],
+                        question=question.question
+                    )
+                    if not summary:
+                        continue
+                    points = summary.split("\n\n")
+
+                # Create metadata
+                metadata = ContentMetadata(
+                    title=page_title,
+                    url=source,
+                    content_type="text"
+                )
+
+                # Extract key points (simplified version)
+                key_points = [
+                    KeyPoint(text=point.strip(), confidence=0.8)
+                    for point in points[:3] if point.strip()
+                ]
+
+                # Create finding
+                batch_findings.append(ContentFinding(
+                    source=source,
+                    metadata=metadata,
+                    key_points=key_points,
+                    summary=summary[:500],  # Truncate summary
+                    confidence=0.8
+                ))
+            return batch_findings
+
+        # Group the fetched pages per question and analyze them in batches
+        batches = []
+        for question in plan.questions:
+            fetched = [
+                (source, *pages[source])
+                for source in dict.fromkeys(question.sources) if source in pages
+            ]
+            batches.extend(
+                (question, fetched[j:j + GEMINI_BATCH_SIZE])
+                for j in range(0, len(fetched), GEMINI_BATCH_SIZE)
+            )
+        results = await asyncio.gather(
+            *[analyze_batch(question, batch) for question, batch in batches],
+            return_exceptions=True
+        )
+
+        findings = []
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Error analyzing sources: {str(result)}")
+            else:
+                findings.extend(result)
+
+        return findings
+
     async def execute_web_research(self, plan: ResearchPlan) -> List[ContentFinding]:
         """Execute web research based on the research plan."""
         if not self.browser:
             await self.initialize_browser()
-            
-        findings = []
-        
-        # Collect content from each source in the plan
-        for question in plan.questions:
-            for source in question.sources:
-                logger.info(f"Researching: {source}")
-                
-                try:
-                    # Navigate to the page
-                    page = await self.context.new_page()
-                    await page.goto(source, wait_until="networkidle", timeout=30000)
-                    
-                    # Extract content
-                    page_content = await page.content()
-                    page_title = await page.title()
-                    
-                    # Use rate-limited Gemini for content analysis if available
-                    if self.research_engine:
-                        analysis = await self.analyze_with_gemini_rate_limited(
-                            content=page_content, 
-                            question=question.question
-                        )
-                        
-                        if analysis:
-                            
-                            # Create metadata
-                            metadata = ContentMetadata(
-                                title=page_title,
-                                url=source,
-                                content_type="text"
-                            )
-                            
-                            # Extract key points (simplified version)
-                            key_points = [
-                                KeyPoint(text=point.strip(), confidence=0.8)
-                                for point in analysis.split("\n\n")[:3] if point.strip()
-                            ]
-                            
-                            # Create finding
-                            finding = ContentFinding(
-                                source=source,
-                                metadata=metadata,
-                                key_points=key_points,
-                                summary=analysis[:500],  # Truncate summary
-                                confidence=0.8,
-                                raw_content=page_content[:5000]  # Truncate raw content
-                            )
-                            
-                            findings.append(finding)
-                    
-                    await page.close()
-                    
-                except Exception as e:
-                    logger.error(f"Error researching {source}: {str(e)}")
-                    
-        return findings
+
+        # Collect content from every source in the plan concurrently
+        sources = self.plan_sources(plan)
+        results = await asyncio.gather(
+            *[self.fetch_source(source) for source in sources],
+            return_exceptions=True
+        )
+
+        pages = {}
+        for source, result in zip(sources, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error researching {source}: {str(result)}")
+            else:
+                pages[source] = result
+
+        return await self.analyze_sources(plan, pages)
     
-    @task(cache_policy=NO_CACHE)
-    async def validate_findings(self, findings: List[ContentFinding]) -> List[ContentFinding]:
+    @staticmethod
+    def validate_findings(findings: List[ContentFinding]) -> List[ContentFinding]:
         """Validate the research findings."""
-        validated_findings = []
-        
-        for finding in findings:
-            # Simple validation check (can be expanded)
-            if finding.metadata and finding.key_points and len(finding.key_points) > 0:
-                validated_findings.append(finding)
-                
-        return validated_findings
+        # Simple validation check (can be expanded). Pure in-memory work, so it
+        # is neither async nor a Prefect task
+        return [f for f in findings if f.metadata is not None and f.key_points]
     
-    @task(cache_policy=NO_CACHE)
     async def generate_output(self, plan: ResearchPlan, findings: List[ContentFinding]) -> ResearchOutput:
         """Generate the final research output."""
-        from datetime import datetime
-        
         # Compile summaries
         summaries = [f.summary for f in findings if f.summary]
         combined_summary = "\n\n".join(summaries)
         
         # Generate an integrated summary using DeepSeek
-        summary_prompt = ChatPromptTemplate.from_messages([
-            ("system", "You are a research synthesis expert. Create a comprehensive summary from the collected findings."),
-            ("human", f"Research objective: {plan.objective}\n\nFindings:\n{combined_summary}\n\nCreate a comprehensive summary.")
-        ])
-        
-        summary_chain = summary_prompt | self.generator
-        result = await summary_chain.ainvoke({})
+        summary_chain = SUMMARY_PROMPT | self.generator
+        result = await summary_chain.ainvoke({
+            "objective": plan.objective,
+            "findings": combined_summary
+        })
         
         # Create the output
         output = ResearchOutput(
             objective=plan.objective,
             findings=findings,
             summary=result.content,
-            created_at=datetime.now().isoformat()
+            created_at=datetime.now(timezone.utc).isoformat()
         )
         
         return output
@@ -502,7 +931,7 @@ class ResearchSystem:
             findings = await self.execute_web_research(plan)
             
             # Validate findings
-            validated = await self.validate_findings(findings)
+            validated = self.validate_findings(findings)
             
             # Generate output
             output = await self.generate_output(plan, validated)
@@ -512,16 +941,17 @@ class ResearchSystem:
         except Exception as e:
             logger.error(f"Error running research task: {str(e)}")
             # Create a minimal error output
-            from datetime import datetime
             return ResearchOutput(
                 objective=query,
                 findings=[],
                 summary=f"Research could not be completed due to an error: {str(e)}",
-                created_at=datetime.now().isoformat()
+                created_at=datetime.now(timezone.utc).isoformat()
             )
         finally:
-            # Clean up
-            await self.close_browser()
+            # Keep Chromium running for the next query and only drop this
+            # query's cookies and pages; close() shuts the browser down
+            if self.browser:
+                await self.recycle_context()
 
 
 # Example usage - async main function
@@ -534,6 +964,8 @@ async def main():
         print(f"Research completed. Generated a summary of {len(result.summary)} characters with {len(result.findings)} sources.")
     except Exception as e:
         print(f"Error running research task: {str(e)}")
+    finally:
+        await system.close()
 
 
 if __name__ == "__main__":
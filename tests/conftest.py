@@ -0,0 +1,42 @@
+import pytest
+import pytest_asyncio
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def playwright_instance():
+    """Istanza Playwright avviata una sola volta per sessione."""
+    from playwright.async_api import async_playwright
+
+    p = await async_playwright().start()
+    yield p
+    await p.stop()
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def browser_controller(playwright_instance):
+    """
+    BrowserController condiviso da tutta la sessione di test.
+
+    Chromium viene avviato una sola volta; l'isolamento tra test è dato
+    dalle pagine e dai cookie, non da un nuovo browser. Import pigro: i moduli
+    di test che non usano il browser non importano browser_controller.
+    """
+    from playwright.async_api import Error as PlaywrightError
+    from browser_controller import BrowserController
+
+    bc = BrowserController()
+    try:
+        await bc.initialize(playwright=playwright_instance, block_resources=True)
+    except PlaywrightError as e:
+        pytest.skip(f"Chromium non disponibile: {e}")
+    yield bc
+    await bc.close()
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def browser_page(browser_controller):
+    """Pagina nuova sul contesto condiviso, con cookie ripuliti a fine test."""
+    page = await browser_controller.context.new_page()
+    yield page
+    await page.close()
+    await browser_controller.context.clear_cookies()
@@ -1,18 +1,31 @@
 import unittest
-import asyncio
 from unittest.mock import patch, MagicMock, AsyncMock
 
+import pytest
 from playwright.async_api import Page, Response, Browser, BrowserContext
 from models import ResearchTask, ContentMetadata
-from browser_controller import BrowserController
+from browser_controller import BrowserController, BROWSER_LAUNCH_ARGS
 
 
-class TestBrowserController(unittest.TestCase):
+def _make_page_mock(status=200, error=None):
+    """Build a mock page whose goto() returns a response with the given status, or raises error."""
+    page = AsyncMock()
+    if error is not None:
+        page.goto = AsyncMock(side_effect=error)
+    else:
+        page.goto = AsyncMock(return_value=MagicMock(status=status))
+    return page
+
+
+class TestBrowserController(unittest.IsolatedAsyncioTestCase):
     """Tests for the BrowserController class."""
     
     def setUp(self):
         """Set up test fixtures."""
         self.browser_controller = BrowserController()
+        # Nessuna attesa casuale tra le richieste nei test
+        self.browser_controller.MIN_DELAY = 0
+        self.browser_controller.MAX_DELAY = 0
         
         # Create a test task
         self.test_task = ResearchTask(
@@ -22,12 +35,17 @@ class TestBrowserController(unittest.TestCase):
             status="ready"
         )
     
+    def _use_page(self, page):
+        """Make the controller's context hand out the given page."""
+        self.browser_controller.context = AsyncMock()
+        self.browser_controller.context.new_page = AsyncMock(return_value=page)
+        return page
+    
     @patch('browser_controller.async_playwright')
     async def test_initialize(self, mock_playwright):
         """Test the initialize method."""
         # Setup mocks
         mock_playwright_instance = AsyncMock()
-        mock_playwright.return_value.start = AsyncMock(return_value=mock_playwright_instance)
         
         mock_chromium = AsyncMock()
         mock_playwright_instance.chromium = mock_chromium
@@ -38,17 +56,28 @@ class TestBrowserController(unittest.TestCase):
         mock_context = AsyncMock()
         mock_browser.new_context = AsyncMock(return_value=mock_context)
         
-        # Call the method
-        await self.browser_controller.initialize()
+        # Call the method with an injected Playwright instance
+        await self.browser_controller.initialize(playwright=mock_playwright_instance, block_resources=True)
         
-        # Check that the browser was launched
-        mock_playwright.return_value.start.assert_called_once()
-        mock_chromium.launch.assert_called_once_with(headless=True)
+        # Check that the browser was launched without starting Playwright again
+        mock_playwright.assert_not_called()
+        mock_chromium.launch.assert_called_once_with(headless=True, args=BROWSER_LAUNCH_ARGS)
+        self.assertIn("--disable-gpu", BROWSER_LAUNCH_ARGS)
         mock_browser.new_context.assert_called_once()
+        _, context_kwargs = mock_browser.new_context.call_args
+        self.assertEqual(context_kwargs['viewport'], {'width': 1280, 'height': 720})
+        self.assertEqual(context_kwargs['device_scale_factor'], 1)
+        mock_context.route.assert_called_once()
         
         # Check that the browser and context were saved
         self.assertEqual(self.browser_controller.browser, mock_browser)
         self.assertEqual(self.browser_controller.context, mock_context)
+        
+        # Without block_resources the context loads every resource (screenshots)
+        mock_context.route.reset_mock()
+        await self.browser_controller.initialize(playwright=mock_playwright_instance)
+        mock_context.route.assert_not_called()
+        self.assertFalse(self.browser_controller.block_resources)
     
     async def test_close(self):
         """Test the close method."""
@@ -67,33 +96,23 @@ class TestBrowserController(unittest.TestCase):
     async def test_open_url_success(self, mock_initialize):
         """Test the open_url method with a successful response."""
         # Setup mocks
-        self.browser_controller.context = AsyncMock()
-        mock_page = AsyncMock()
-        self.browser_controller.context.new_page = AsyncMock(return_value=mock_page)
-        
-        mock_response = AsyncMock()
-        mock_response.status = 200
-        mock_page.goto = AsyncMock(return_value=mock_response)
+        mock_page = self._use_page(_make_page_mock(200))
         
         # Call the method
-        page, success = await self.browser_controller.open_url("https://example.com")
+        page, success = await self.browser_controller.open_url(
+            "https://example.com", wait_until='domcontentloaded'
+        )
         
         # Check results
         self.assertEqual(page, mock_page)
         self.assertTrue(success)
-        mock_page.goto.assert_called_once_with("https://example.com", wait_until='networkidle', timeout=30000)
+        mock_page.goto.assert_called_once_with("https://example.com", wait_until='domcontentloaded', timeout=30000)
     
     @patch.object(BrowserController, 'initialize')
     async def test_open_url_failure(self, mock_initialize):
         """Test the open_url method with a failed response."""
         # Setup mocks
-        self.browser_controller.context = AsyncMock()
-        mock_page = AsyncMock()
-        self.browser_controller.context.new_page = AsyncMock(return_value=mock_page)
-        
-        mock_response = AsyncMock()
-        mock_response.status = 404
-        mock_page.goto = AsyncMock(return_value=mock_response)
+        mock_page = self._use_page(_make_page_mock(404))
         
         # Call the method
         page, success = await self.browser_controller.open_url("https://example.com/notfound")
@@ -107,11 +126,7 @@ class TestBrowserController(unittest.TestCase):
     async def test_open_url_error(self, mock_initialize):
         """Test the open_url method with an exception."""
         # Setup mocks
-        self.browser_controller.context = AsyncMock()
-        mock_page = AsyncMock()
-        self.browser_controller.context.new_page = AsyncMock(return_value=mock_page)
-        
-        mock_page.goto = AsyncMock(side_effect=Exception("Test error"))
+        self._use_page(_make_page_mock(error=Exception("Test error")))
         
         # Call the method
         page, success = await self.browser_controller.open_url("https://example.com")
@@ -158,6 +173,22 @@ class TestBrowserController(unittest.TestCase):
         self.assertEqual(result["metadata"].author, "Test Author")
         self.assertEqual(result["metadata"].url, "https://example.com")
     
+    @patch.object(BrowserController, '_extract_metadata', new_callable=AsyncMock)
+    @patch.object(BrowserController, '_extract_images', new_callable=AsyncMock, return_value=[])
+    @patch.object(BrowserController, 'analyze_visual_content', new_callable=AsyncMock, return_value={})
+    @patch.object(BrowserController, 'extract_content', new_callable=AsyncMock, return_value={})
+    async def test_semantic_browse_bypasses_resource_blocking(self, *mocks):
+        """On a blocking context, semantic_browse pages load every resource."""
+        self.browser_controller.gemini = MagicMock(generate_text=AsyncMock(return_value=""))
+        mock_page = self._use_page(_make_page_mock(200))
+        
+        await self.browser_controller.semantic_browse("https://example.com")
+        mock_page.route.assert_not_called()
+        
+        self.browser_controller.block_resources = True
+        await self.browser_controller.semantic_browse("https://example.com")
+        mock_page.route.assert_called_once()
+    
     @patch.object(BrowserController, 'initialize')
     @patch.object(BrowserController, 'open_url')
     @patch.object(BrowserController, 'extract_content')
@@ -189,5 +220,22 @@ class TestBrowserController(unittest.TestCase):
         self.assertEqual(result["findings"][0]["content"], "Test content")
 
 
+# Test su Chromium reale: usano le fixture di sessione di conftest.py e
+# vengono saltati se il browser non è installato (`playwright install chromium`)
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_live_page_renders_content(browser_page):
+    """A page from the shared context renders HTML."""
+    await browser_page.set_content("<html><body><h1>Ricerca</h1></body></html>")
+    assert await browser_page.inner_text("h1") == "Ricerca"
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_live_context_is_shared(browser_controller, browser_page):
+    """Test pages are opened on the session's single context, with the lean viewport."""
+    assert browser_page.context is browser_controller.context
+    assert browser_page.viewport_size == {"width": 1280, "height": 720}
+
+
 if __name__ == '__main__':
-    asyncio.run(unittest.main())
+    unittest.main()
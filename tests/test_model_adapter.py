@@ -0,0 +1,88 @@
+import asyncio
+import json
+import unittest
+from unittest.mock import patch
+
+from aiohttp import web
+
+import model_adapter
+from model_adapter import ModelAdapter, ModelType
+
+
+class TestGenerateStream(unittest.IsolatedAsyncioTestCase):
+    """Tests for streaming generation against a local fake Ollama server."""
+
+    async def asyncSetUp(self):
+        """Start a fake Ollama server; each test sets the handler behaviour."""
+        self.handler = None
+        app = web.Application()
+        app.router.add_post("/api/generate", lambda request: self.handler(request))
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        url_patch = patch.object(model_adapter, "OLLAMA_BASE_URL", f"http://127.0.0.1:{port}")
+        url_patch.start()
+        self.addCleanup(url_patch.stop)
+
+        self.adapter = ModelAdapter.__new__(ModelAdapter)
+        self.adapter.ollama_available = True
+        self.adapter.ollama_models = []
+        self.adapter.gemini_available = True
+
+    async def asyncTearDown(self):
+        await self.runner.cleanup()
+
+    def _stream_handler(self, writes, status=200):
+        """Handler that sends the given byte strings as separate writes."""
+        async def handler(request):
+            response = web.StreamResponse(status=status)
+            await response.prepare(request)
+            for data in writes:
+                await response.write(data)
+                await asyncio.sleep(0.01)
+            await response.write_eof()
+            return response
+        return handler
+
+    async def _collect(self):
+        return [chunk async for chunk in self.adapter.generate_stream("Prompt", ModelType.VALIDATOR)]
+
+    async def test_line_split_across_reads(self):
+        """An NDJSON line split between two writes is reassembled."""
+        first = json.dumps({"response": "Ciao "}) + "\n"
+        second = json.dumps({"response": "mondo", "done": True}) + "\n"
+        self.handler = self._stream_handler([
+            first.encode(), second[:7].encode(), second[7:].encode()
+        ])
+        with patch.object(model_adapter.GeminiClient, "generate") as gemini:
+            self.assertEqual(await self._collect(), ["Ciao ", "mondo"])
+            gemini.assert_not_called()
+
+    async def test_error_after_output_does_not_fall_back(self):
+        """Once text has been yielded, an Ollama error is raised, not retried on Gemini."""
+        self.handler = self._stream_handler([
+            (json.dumps({"response": "Parziale"}) + "\n").encode(),
+            (json.dumps({"error": "model crashed"}) + "\n").encode(),
+        ])
+        chunks = []
+        with patch.object(model_adapter.GeminiClient, "generate") as gemini:
+            with self.assertRaises(RuntimeError):
+                async for chunk in self.adapter.generate_stream("Prompt", ModelType.VALIDATOR):
+                    chunks.append(chunk)
+            gemini.assert_not_called()
+        self.assertEqual(chunks, ["Parziale"])
+
+    async def test_error_before_output_falls_back(self):
+        """An Ollama failure before any text falls back to a single Gemini chunk."""
+        self.handler = self._stream_handler([b"errore interno"], status=500)
+        with patch.object(
+            model_adapter.GeminiClient, "generate", return_value={"response": "Da Gemini"}
+        ) as gemini:
+            self.assertEqual(await self._collect(), ["Da Gemini"])
+            gemini.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,247 @@
+import asyncio
+import json
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from langchain_core.language_models import FakeListChatModel
+
+import research_system
+from research_system import ResearchPlan, ResearchQuestion, ResearchSystem, _parse_llm_json
+
+
+def _system():
+    """ResearchSystem with mocked models, so no shared client is created."""
+    return ResearchSystem(llm=MagicMock(), wiki_tool=MagicMock(), research_engine=MagicMock())
+
+
+class _FakePage:
+    """Playwright page stand-in; goto fails when reset_fails is set."""
+
+    def __init__(self, context, reset_fails=False):
+        self.context = context
+        self.reset_fails = reset_fails
+        self.closed = False
+
+    def is_closed(self):
+        return self.closed
+
+    async def goto(self, url):
+        if self.reset_fails:
+            raise RuntimeError("reset failed")
+
+    async def close(self):
+        self.closed = True
+
+
+class _FakeContext:
+    """Browser context stand-in that counts opened pages; new_page fails once if fail_next is set."""
+
+    def __init__(self):
+        self.opened = 0
+        self.fail_next = False
+
+    async def new_page(self):
+        if self.fail_next:
+            self.fail_next = False
+            raise RuntimeError("new_page failed")
+        self.opened += 1
+        return _FakePage(self)
+
+    async def route(self, pattern, handler):
+        pass
+
+    async def close(self):
+        pass
+
+
+class TestAnalyzeSourcesBatch(unittest.IsolatedAsyncioTestCase):
+    """Tests for the batched Gemini analysis."""
+
+    async def asyncSetUp(self):
+        self.system = _system()
+        self.batch = [
+            ("https://example.com/a?utm_source=x&id=1", "Primo testo"),
+            ("https://example.org/b", "Secondo testo"),
+        ]
+
+    async def test_answers_are_mapped_back_by_id(self):
+        """The prompt carries short ids, and the answer is keyed back to the URLs."""
+        response = "Ecco l'analisi:\n" + json.dumps({
+            "S1": {"key_points": ["uno"], "summary": "Primo"},
+            "[s2]": {"key_points": ["due"], "summary": "Secondo"},
+        }) + "\nFine."
+        with patch.object(self.system, "_generate_with_gemini", AsyncMock(return_value=response)) as gemini:
+            analyses = await self.system.analyze_sources_batch("Domanda?", self.batch)
+
+        prompt = gemini.await_args.args[0]
+        self.assertIn("[S1]\nPrimo testo", prompt)
+        self.assertNotIn(self.batch[0][0], prompt)
+        self.assertEqual(
+            {url: analysis.summary for url, analysis in analyses.items()},
+            {self.batch[0][0]: "Primo", self.batch[1][0]: "Secondo"}
+        )
+
+    async def test_unknown_keys_and_invalid_json_are_dropped(self):
+        """Keys outside the batch are ignored; unparseable answers give an empty result."""
+        response = json.dumps({"S9": {"summary": "?"}, "https://example.org/b": {"summary": "Ok"}})
+        with patch.object(self.system, "_generate_with_gemini", AsyncMock(return_value=response)):
+            analyses = await self.system.analyze_sources_batch("Domanda?", self.batch)
+        self.assertEqual(list(analyses), ["https://example.org/b"])
+
+        with patch.object(self.system, "_generate_with_gemini", AsyncMock(return_value='{"S1": [1, 2]}')):
+            self.assertEqual(await self.system.analyze_sources_batch("Domanda?", self.batch), {})
+
+
+class TestWebResearch(unittest.IsolatedAsyncioTestCase):
+    """Tests for the concurrent source fetching."""
+
+    def _plan(self):
+        return ResearchPlan(objective="Obiettivo", depth=1, questions=[
+            ResearchQuestion(question="Prima?", importance=3, sources=["https://a", "https://b"]),
+            ResearchQuestion(question="Seconda?", importance=3, sources=["https://b", "https://c"]),
+        ])
+
+    def test_plan_sources_deduplicates_in_order(self):
+        """Sources shared between questions are listed once, in first-seen order."""
+        self.assertEqual(ResearchSystem.plan_sources(self._plan()), ["https://a", "https://b", "https://c"])
+
+    async def test_failed_sources_are_skipped(self):
+        """Each source is fetched once; a failing fetch does not stop the others."""
+        system = _system()
+        system.browser = MagicMock()
+
+        async def fetch_source(source):
+            if source == "https://b":
+                raise TimeoutError("timeout")
+            return f"Titolo {source}", f"Testo {source}"
+
+        with patch.object(system, "fetch_source", side_effect=fetch_source) as fetch, \
+                patch.object(system, "analyze_sources", AsyncMock(return_value=[])) as analyze:
+            await system.execute_web_research(self._plan())
+
+        self.assertEqual([c.args[0] for c in fetch.call_args_list], ["https://a", "https://b", "https://c"])
+        self.assertEqual(list(analyze.await_args.args[1]), ["https://a", "https://c"])
+
+
+class TestPagePool(unittest.IsolatedAsyncioTestCase):
+    """Tests for the pooled pages and their concurrency slots."""
+
+    async def asyncSetUp(self):
+        self.system = _system()
+        self.system.browser = MagicMock()
+        self.system.browser.new_context = AsyncMock(side_effect=lambda **kwargs: self.context)
+        self.context = _FakeContext()
+        with patch.object(research_system, "MAX_CONCURRENT_PAGES", 2):
+            await self.system._new_context()
+
+    def _free_slots(self):
+        return self.system._page_slots._value
+
+    async def test_released_page_is_reused(self):
+        """A released page goes back to the pool and its slot is freed."""
+        page = await self.system._acquire_page()
+        self.assertEqual(self._free_slots(), 1)
+        await self.system._release_page(page)
+        self.assertEqual(self._free_slots(), 2)
+        self.assertIs(await self.system._acquire_page(), page)
+        self.assertEqual(self.context.opened, 1)
+
+    async def test_failed_open_returns_the_slot(self):
+        """A new_page failure does not consume a slot."""
+        self.context.fail_next = True
+        with self.assertRaises(RuntimeError):
+            await self.system._acquire_page()
+        self.assertEqual(self._free_slots(), 2)
+
+    async def test_unresettable_page_is_discarded(self):
+        """A page that cannot be reset is closed, its slot freed and later replaced."""
+        page = await self.system._acquire_page()
+        page.reset_fails = True
+        await self.system._release_page(page)
+        self.assertTrue(page.closed)
+        self.assertEqual(self._free_slots(), 2)
+        self.assertIsNot(await self.system._acquire_page(), page)
+        self.assertEqual(self.context.opened, 2)
+
+    async def test_slots_bound_open_pages(self):
+        """Beyond MAX_CONCURRENT_PAGES, acquiring waits for a release."""
+        first = await self.system._acquire_page()
+        await self.system._acquire_page()
+        waiter = asyncio.ensure_future(self.system._acquire_page())
+        await asyncio.sleep(0)
+        self.assertFalse(waiter.done())
+        await self.system._release_page(first)
+        self.assertIs(await asyncio.wait_for(waiter, 1), first)
+        self.assertEqual(self.context.opened, 2)
+
+    async def test_page_of_recycled_context_is_dropped(self):
+        """Pages of a replaced context never enter the new pool."""
+        page = await self.system._acquire_page()
+        self.context = _FakeContext()
+        await self.system.recycle_context()
+        await self.system._release_page(page)
+        self.assertTrue(self.system._page_pool.empty())
+        self.assertEqual(self._free_slots(), research_system.MAX_CONCURRENT_PAGES)
+
+
+class TestParseLlmJson(unittest.TestCase):
+    """Tests for the JSON recovery of LLM responses."""
+
+    def test_object_between_prose(self):
+        """The slice between the outer braces is parsed directly."""
+        self.assertEqual(_parse_llm_json('Ecco il piano: {"a": {"b": 1}} Fine.'), {"a": {"b": 1}})
+
+    def test_stray_brace_after_object(self):
+        """A '}' in trailing prose falls back to decoding the first object."""
+        with patch.object(research_system, "from_json", wraps=research_system.from_json) as partial:
+            self.assertEqual(_parse_llm_json('{"a": 1} e una graffa } finale'), {"a": 1})
+        partial.assert_not_called()
+
+    def test_truncated_object(self):
+        """A response cut off mid-object is recovered as far as it goes."""
+        self.assertEqual(_parse_llm_json('Piano: {"a": 1, "b": [1, 2'), {"a": 1, "b": [1, 2]})
+
+
+class TestCreateResearchPlan(unittest.IsolatedAsyncioTestCase):
+    """Tests for create_research_plan."""
+
+    def _system(self, response):
+        system = ResearchSystem(
+            llm=FakeListChatModel(responses=[response]),
+            wiki_tool=MagicMock(),
+            research_engine=MagicMock()
+        )
+        system.perform_search = AsyncMock(return_value=["https://example.com"])
+        return system
+
+    async def test_valid_plan_is_not_repaired(self):
+        """A conformant plan is validated as is, without fix_json_structure."""
+        system = self._system(json.dumps({
+            "objective": "Obiettivo",
+            "questions": [{"question": "Domanda?", "importance": 4}],
+            "depth": 2
+        }))
+        with patch.object(ResearchSystem, "fix_json_structure") as fix:
+            plan = await system.create_research_plan("Query")
+        fix.assert_not_called()
+        self.assertEqual(plan.objective, "Obiettivo")
+        self.assertEqual(plan.questions[0].sources, ["https://example.com"])
+
+    async def test_invalid_plan_is_repaired_and_revalidated(self):
+        """A plan that fails validation is repaired once and validated again."""
+        system = self._system("Piano:\n" + json.dumps({
+            "objective": {"title": "Obiettivo"},
+            "questions": [{"question": "Domanda?", "importance": {"value": 5}, "source": "https://a"}],
+            "depth": {"value": 3}
+        }))
+        with patch.object(ResearchSystem, "fix_json_structure", autospec=True,
+                          side_effect=ResearchSystem.fix_json_structure) as fix:
+            plan = await system.create_research_plan("Query")
+        fix.assert_called_once()
+        self.assertEqual((plan.objective, plan.depth), ("Obiettivo", 3))
+        self.assertEqual(plan.questions[0].importance, 5)
+        system.perform_search.assert_awaited_once_with("Obiettivo Domanda?")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+import os
+import random
+import re
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+import utils
+from utils import (
+    _WORD_PATTERN, _significant_terms, identify_connections,
+    save_research_output, load_research_output, load_research_output_from_db
+)
+
+try:
+    import regex
+except ImportError:
+    regex = None
+
+
+# Testo di prova: parole inglesi e italiane (anche accentate), numeri,
+# apostrofi, trattini e punteggiatura
+_VOCABULARY = [
+    "università", "città", "perché", "regolamentazione", "sicurezza", "framework",
+    "cybersecurity", "directive", "wouldn't", "l'analisi", "state-of-the-art",
+    "2023", "NIS2", "data_set", "agree", "disagree", "più", "naïve", "Europe",
+    ".", ",", ";", "(", ")", "—", "\n",
+]
+
+
+def _random_text(rng, words=40):
+    return " ".join(rng.choice(_VOCABULARY) for _ in range(words)).lower()
+
+
+class TestSignificantTerms(unittest.TestCase):
+    """Tests for the key-point tokenizer used by identify_connections."""
+
+    def test_accented_words_are_not_truncated(self):
+        """Accented words are dropped whole, never cut at the accent."""
+        terms = _significant_terms("l'università e la città di roma, framework europeo")
+        self.assertEqual(terms, {"framework", "europeo"})
+
+    def test_matches_original_rule(self):
+        """Same terms as the original per-key-point regex (4+ letters, kept if > 4)."""
+        rng = random.Random(0)
+        for _ in range(300):
+            text = _random_text(rng)
+            expected = {w for w in re.findall(r'\b[A-Za-z]{4,}\b', text) if len(w) > 4}
+            self.assertEqual(_significant_terms(text), expected, text)
+
+    @unittest.skipIf(regex is None, "regex module not installed")
+    def test_backends_agree(self):
+        """The regex module and stdlib re backends return the same terms."""
+        rng = random.Random(1)
+        re_backend = re.compile(_WORD_PATTERN)
+        regex_backend = regex.compile(_WORD_PATTERN)
+        for _ in range(300):
+            text = _random_text(rng)
+            self.assertEqual(
+                set(re_backend.findall(text)),
+                set(regex_backend.findall(text)),
+                text
+            )
+            self.assertEqual(_significant_terms(text), set(re_backend.findall(text)), text)
+
+
+class TestIdentifyConnections(unittest.TestCase):
+    """Tests for identify_connections."""
+
+    def test_returns_plain_dicts(self):
+        """Connections are plain dicts, so every serializer writes the same shape."""
+        findings = [
+            {"source": "a", "summary": "studies agree", "key_points": [
+                {"text": "framework regulation directive security"}]},
+            {"source": "b", "summary": "experts disagree", "key_points": [
+                {"text": "framework regulation directive europe"}]},
+        ]
+        connections = identify_connections(findings)
+        self.assertEqual([c["relation"] for c in connections], ["contrasto", "supporto"])
+        for connection in connections:
+            self.assertIs(type(connection), dict)
+            self.assertEqual(
+                set(connection), {"source", "target", "relation", "strength", "description"}
+            )
+
+    def test_single_core_skips_process_pool(self):
+        """With one CPU large inputs are still analysed serially, without a pool."""
+        findings = [
+            {"source": str(i), "summary": "studies agree", "key_points": [
+                {"text": "framework regulation directive security"}]}
+            for i in range(utils.PARALLEL_CONNECTIONS_MIN_FINDINGS)
+        ]
+        with patch.object(utils.os, "cpu_count", return_value=1), \
+                patch.object(utils, "ProcessPoolExecutor") as pool, \
+                patch.object(utils, "SPARSE_OVERLAP_MIN_FINDINGS", len(findings) + 1):
+            connections = identify_connections(findings)
+        pool.assert_not_called()
+        self.assertEqual(len(connections), len(findings) * (len(findings) - 1) // 2)
+
+
+class TestResearchOutputPersistence(unittest.TestCase):
+    """Round trips through save_research_output and the loaders."""
+
+    def setUp(self):
+        """Create a scratch output directory and a sample output."""
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = self._tmp.name
+        self.created_at = datetime(2023, 5, 17, 9, 30, 15)
+        self.output = {
+            "task_id": "task-1",
+            "created_at": self.created_at,
+            "summary": "Città e università",
+            "connections": [{"source": "a", "target": "b", "strength": 0.7}],
+        }
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_json_round_trip(self):
+        """Datetimes are written with str(), the same form as the stdlib fallback."""
+        path = save_research_output(self.output, self.directory)
+        data = load_research_output(path)
+        self.assertEqual(data["created_at"], str(self.created_at))
+        self.assertEqual(data["summary"], self.output["summary"])
+        self.assertEqual(data["connections"], self.output["connections"])
+
+    def test_sqlite_round_trip(self):
+        """The sqlite format stores the same payload as the JSON file."""
+        save_research_output(self.output, self.directory, format="sqlite")
+        data = load_research_output_from_db("task-1", self.directory)
+        self.assertEqual(data["created_at"], str(self.created_at))
+        self.assertEqual(data["connections"], self.output["connections"])
+
+    @unittest.skipIf(utils.orjson is None, "orjson not installed")
+    def test_same_file_with_and_without_orjson(self):
+        """The written file does not depend on whether orjson is installed."""
+        with open(save_research_output(self.output, self.directory), "rb") as f:
+            with_orjson = f.read()
+        with patch.object(utils, "orjson", None):
+            path = save_research_output(self.output, os.path.join(self.directory, "stdlib"))
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), with_orjson)
+        with patch.object(utils, "orjson", None):
+            compact_stdlib = utils._dumps_compact(self.output)
+        self.assertEqual(utils._dumps_compact(self.output), compact_stdlib)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,212 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import validator
+from validator import (
+    ContentValidation, ContentValidator, SourceValidation, ValidationCache,
+    _JsonObjectScanner, _extract_first_json_object
+)
+
+
+def _validation_json(task_id="echo-task", content_id="echo-content", passed=True, score=0.9):
+    return json.dumps({
+        "task_id": task_id,
+        "content_id": content_id,
+        "validation_passed": passed,
+        "overall_score": score,
+        "criteria_scores": {"factual_accuracy": score},
+        "validation_date": "2023-01-01T00:00:00"
+    })
+
+
+def _validation(**kwargs):
+    data = dict(task_id="t", content_id="c", validation_passed=True, overall_score=0.9,
+                validation_date="2023-01-01T00:00:00")
+    data.update(kwargs)
+    return ContentValidation(**data)
+
+
+class TestJsonObjectScanner(unittest.TestCase):
+    """Tests for the incremental JSON scanner."""
+
+    def test_first_object(self):
+        """Only the first balanced object is returned; braces inside strings are ignored."""
+        text = 'Ecco {"a": "}\\"{", "b": {"c": [1, 2]}} e poi {"d": 1}'
+        self.assertEqual(_extract_first_json_object(text), '{"a": "}\\"{", "b": {"c": [1, 2]}}')
+
+    def test_chunked_feed(self):
+        """The object is returned as soon as it closes, however the text is split."""
+        text = 'Ecco {"a": "}\\"{", "b": {"c": [1, 2]}} e poi {"d": 1}'
+        for size in (1, 2, 3, 7, len(text)):
+            scanner = _JsonObjectScanner()
+            result = None
+            for i in range(0, len(text), size):
+                result = scanner.feed(text[i:i + size])
+                if result is not None:
+                    break
+            self.assertEqual(result, '{"a": "}\\"{", "b": {"c": [1, 2]}}')
+
+    def test_incomplete_object(self):
+        """An object that never closes yields None."""
+        self.assertIsNone(_extract_first_json_object('testo {"a": {"b": 1}'))
+        self.assertIsNone(_extract_first_json_object("nessun json"))
+
+    def test_array_mode(self):
+        """With bracket delimiters the first top-level list is returned."""
+        scanner = _JsonObjectScanner("[", "]")
+        self.assertEqual(scanner.feed('Risultati: [{"x": "]"}, [1]] fine'), '[{"x": "]"}, [1]]')
+
+
+class TestValidationCache(unittest.TestCase):
+    """Tests for ValidationCache."""
+
+    def setUp(self):
+        """Create a cache database in a scratch directory."""
+        self._tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self._tmp.name, "cache", "validation_cache.db")
+        self.cache = ValidationCache(db_path=self.db_path, semantic=False)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_exact_hit(self):
+        """Whitespace and source order do not change the key."""
+        key = ValidationCache.canonical_key("Domanda?", "Contenuto  di prova", ["b", "a"])
+        self.cache.put(key, "{}")
+        same = ValidationCache.canonical_key(" Domanda? ", "Contenuto di prova", ["a", " b"])
+        self.assertEqual(self.cache.get(same), "{}")
+        self.assertIsNone(self.cache.get(ValidationCache.canonical_key("Altra?", "x", [])))
+
+    def test_refresh_from_disk(self):
+        """A new cache on the same database sees the stored entries."""
+        key = ValidationCache.canonical_key("Domanda?", "Contenuto", [])
+        self.cache.put(key, '{"ok": true}')
+        self.assertEqual(ValidationCache(db_path=self.db_path, semantic=False).get(key), '{"ok": true}')
+
+    def test_async_writes_are_flushed(self):
+        """Writes queued inside an event loop reach the database."""
+        async def put_many():
+            for i in range(40):
+                self.cache.put(ValidationCache.canonical_key("Domanda?", str(i), []), "{}")
+            await self.cache.flush()
+
+        asyncio.run(put_many())
+        self.assertEqual(len(ValidationCache(db_path=self.db_path, semantic=False)._entries), 40)
+
+    @unittest.skipIf(getattr(validator, "np", None) is None, "numpy not installed")
+    def test_unknown_question_skips_semantic_lookup(self):
+        """A question never cached is a certain miss: no embedding is computed."""
+        np = validator.np
+        self.cache.semantic = True
+        with patch.object(ValidationCache, "_embed", return_value=np.ones(4, dtype=np.float32) / 2) as embed:
+            self.cache.put(ValidationCache.canonical_key("Domanda?", "Contenuto", []), "{}")
+            embed.reset_mock()
+
+            self.assertIsNone(self.cache.get(ValidationCache.canonical_key("Altra domanda?", "Contenuto", [])))
+            embed.assert_not_called()
+
+            # Same question, different content: the semantic layer is consulted
+            self.assertEqual(self.cache.get(ValidationCache.canonical_key("Domanda?", "Contenuto.", [])), "{}")
+            embed.assert_called_once()
+
+    @unittest.skipIf(getattr(validator, "np", None) is None, "numpy not installed")
+    def test_embedding_matrix_grows_in_place(self):
+        """Embeddings past the preallocated rows are kept, and aget finds them off the loop."""
+        np = validator.np
+        rows = validator.VALIDATION_CACHE_INITIAL_ROWS * 2 + 1
+        vectors = np.eye(rows, dtype=np.float32)
+        self.cache.semantic = True
+        keys = [ValidationCache.canonical_key("Domanda?", f"Contenuto {i}", []) for i in range(rows)]
+        with patch.object(ValidationCache, "_embed", side_effect=list(vectors)):
+            for i, key in enumerate(keys):
+                self.cache.put(key, str(i))
+        self.assertEqual(self.cache._matrix.shape[0], validator.VALIDATION_CACHE_INITIAL_ROWS * 4)
+        self.assertEqual(len(self.cache._keys), rows)
+
+        lookup = ValidationCache.canonical_key("Domanda?", "Contenuto simile", [])
+        with patch.object(ValidationCache, "_embed", return_value=vectors[-1]) as embed:
+            self.assertEqual(asyncio.run(self.cache.aget(lookup)), str(rows - 1))
+            embed.assert_called_once_with(lookup)
+
+
+class TestContentValidator(unittest.IsolatedAsyncioTestCase):
+    """Tests for the LLM ContentValidator."""
+
+    def setUp(self):
+        """Set up a validator with a mocked model and an in-memory cache."""
+        with patch("validator.ModelAdapter"):
+            self.validator = ContentValidator(cache=ValidationCache(db_path=":memory:", semantic=False))
+        self.prompts = []
+        self.responses = []
+
+        async def generate_stream(prompt, **kwargs):
+            self.prompts.append(prompt)
+            yield self.responses.pop(0)
+
+        self.validator.model.generate_stream = generate_stream
+
+    async def test_validate_content_uses_caller_ids(self):
+        """The ids come from the caller, not from the model's echo."""
+        self.responses = ["Risultato: " + _validation_json() + " fine"]
+        result = await self.validator.validate_content("task-1", "content-1", "Domanda?", "Testo", [])
+        self.assertEqual((result.task_id, result.content_id), ("task-1", "content-1"))
+        self.assertTrue(result.validation_passed)
+
+    async def test_batch_single_call(self):
+        """An aligned batch response needs a single model call."""
+        self.responses = ["[" + _validation_json() + ", " + _validation_json(passed=False, score=0.2) + "]"]
+        items = [("task-1", "c1", "Primo testo", []), ("task-1", "c2", "Secondo testo", [])]
+        results = await self.validator.validate_content_batch("Domanda?", items)
+        self.assertEqual(len(self.prompts), 1)
+        self.assertEqual([r.content_id for r in results], ["c1", "c2"])
+        self.assertEqual([r.validation_passed for r in results], [True, False])
+
+    async def test_batch_misaligned_falls_back(self):
+        """A batch reply with the wrong number of objects is redone item by item."""
+        self.responses = [
+            "[" + _validation_json() + "]",
+            _validation_json(passed=True),
+            _validation_json(passed=False, score=0.1),
+        ]
+        items = [("task-1", "c1", "Primo testo", []), ("task-1", "c2", "Secondo testo", [])]
+        results = await self.validator.validate_content_batch("Domanda?", items)
+        self.assertEqual(len(self.prompts), 3)
+        self.assertEqual([(r.task_id, r.content_id) for r in results], [("task-1", "c1"), ("task-1", "c2")])
+        self.assertEqual([r.validation_passed for r in results], [True, False])
+
+    async def test_batch_serves_cached_items(self):
+        """Items validated before are not sent to the model again."""
+        self.responses = [_validation_json()]
+        await self.validator.validate_content("task-1", "c1", "Domanda?", "Primo testo", [])
+        results = await self.validator.validate_content_batch("Domanda?", [("task-2", "c9", "Primo testo", [])])
+        self.assertEqual(len(self.prompts), 1)
+        self.assertEqual((results[0].task_id, results[0].content_id), ("task-2", "c9"))
+
+    def test_should_retry_task(self):
+        """Retry reasons are checked in priority order."""
+        cases = [
+            (_validation(), (False, "Validazione superata con successo")),
+            (_validation(validation_passed=False, overall_score=0.1), (True, "Validazione non superata")),
+            (_validation(overall_score=0.5), (True, "Punteggio totale troppo basso: 0.5")),
+            (_validation(criteria_scores={"factual_accuracy": 0.4}),
+             (True, "Gravi problemi di accuratezza fattuale")),
+            (_validation(sources_validation=[
+                SourceValidation(source="a", is_valid=False, relevance_score=0.1),
+                SourceValidation(source="b", is_valid=False, relevance_score=0.1),
+                SourceValidation(source="c", is_valid=True, relevance_score=0.9),
+            ]), (True, "Troppe fonti non valide")),
+            (_validation(sources_validation=[
+                SourceValidation(source="a", is_valid=False, relevance_score=0.1),
+                SourceValidation(source="b", is_valid=True, relevance_score=0.9),
+            ]), (False, "Validazione superata con successo")),
+        ]
+        for validation, expected in cases:
+            self.assertEqual(self.validator.should_retry_task(validation), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
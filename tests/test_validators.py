@@ -0,0 +1,92 @@
+import random
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+import validators
+from validators import ContentValidator, NUMPY_YEAR_THRESHOLD
+from models import ContentFinding, ContentMetadata, KeyPoint
+
+
+def _reference_truncate(text, max_length):
+    """Original intelligent_truncate, with one rfind per terminator."""
+    if not text or len(text) <= max_length:
+        return text
+    truncated = text[:max_length]
+    last_sentence_end = max(truncated.rfind('.'), truncated.rfind('!'), truncated.rfind('?'))
+    if last_sentence_end > max_length * 0.7:
+        return text[:last_sentence_end + 1] + '...'
+    last_space = truncated.rfind(' ')
+    if last_space > 0:
+        return text[:last_space] + '...'
+    return truncated + '...'
+
+
+class TestContentValidator(unittest.TestCase):
+    """Tests for the heuristic ContentValidator."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.validator = ContentValidator()
+        self.current_year = datetime.now().year
+
+    def _finding(self, confidence=0.8, key_points=True, year=None, raw_content=None):
+        return ContentFinding(
+            source="https://example.com",
+            metadata=ContentMetadata(date=datetime(year, 1, 1) if year else None),
+            key_points=[KeyPoint(text="Punto chiave", confidence=0.9)] if key_points else [],
+            confidence=confidence,
+            raw_content=raw_content
+        )
+
+    @unittest.skipIf(validators.np is None, "numpy not installed")
+    def test_extract_year_numpy_matches_python(self):
+        """The vectorized path returns the same year as the plain Python one."""
+        rng = random.Random(0)
+        for _ in range(50):
+            years = [rng.randint(1900, self.current_year + 5) for _ in range(NUMPY_YEAR_THRESHOLD * 2)]
+            content = " ".join(f"nel {year}," for year in years)
+            expected = self.validator.extract_year(content)
+            with patch.object(validators, "np", None):
+                self.assertEqual(self.validator.extract_year(content), expected)
+        self.assertIsNone(self.validator.extract_year("nessun anno qui"))
+
+    def test_extract_year_ignores_far_future(self):
+        """Years beyond next year are discarded."""
+        content = f"Piano {self.current_year + 10}, revisione {self.current_year - 1}"
+        self.assertEqual(self.validator.extract_year(content), self.current_year - 1)
+
+    @unittest.skipIf(validators.np is None, "numpy not installed")
+    def test_validate_findings_bulk_matches_validate_findings(self):
+        """Bulk and per-finding validation split findings identically, in order."""
+        long_content = ("parola " * 400) + f"References {self.current_year}"
+        findings = [
+            self._finding(),
+            self._finding(confidence=0.2),
+            self._finding(key_points=False),
+            self._finding(year=self.current_year - 10),
+            self._finding(year=self.current_year - 1),
+            self._finding(raw_content="troppo corto"),
+            self._finding(raw_content=long_content),
+        ]
+        bulk = self.validator.validate_findings_bulk(findings)
+        plain = self.validator.validate_findings(findings)
+        self.assertEqual(bulk, plain)
+        self.assertEqual(len(bulk[0]), 3)
+
+    def test_intelligent_truncate_matches_reference(self):
+        """The translate-based scan matches the three-rfind version, also on non-ASCII text."""
+        rng = random.Random(1)
+        alphabet = "ab .!?èà€\x01"
+        for _ in range(5000):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 60)))
+            max_length = rng.randint(0, 60)
+            self.assertEqual(
+                self.validator.intelligent_truncate(text, max_length),
+                _reference_truncate(text, max_length),
+                (text, max_length)
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,14 +2,160 @@ import logging
 import os
 import re
 import json
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Tuple
+from itertools import combinations
+from typing import Dict, Any, List, Literal, NamedTuple, Optional, Set, Tuple
 from uuid import UUID
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    logging.warning("orjson non è disponibile. Verrà utilizzato il modulo json standard.")
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    from scipy import sparse
+except ImportError:
+    sparse = None
+
+try:
+    import regex
+except ImportError:
+    regex = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+class ConnectionRecord(NamedTuple):
+    """
+    Lightweight connection between two findings (see models.Connection).
+    
+    Used internally, where results cross process boundaries; callers of
+    identify_connections receive plain dicts.
+    """
+    source: str
+    target: str
+    relation: str
+    strength: float
+    description: str
+
+
+def _json_default(obj: Any) -> Any:
+    """Fallback di serializzazione per i tipi non JSON: rappresentazione testuale."""
+    return str(obj)
+
+
+# Directory di output già create in questo processo
+_DIRS_ENSURED: Set[str] = set()
+
+# Con orjson datetime e dataclass passano da _json_default come con json/msgpack,
+# così il file scritto non dipende dal serializer installato
+if orjson is not None:
+    _ORJSON_OPTIONS = (
+        orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+
+# Encoder JSON riutilizzato quando orjson non è disponibile
+_JSON_ENCODER = json.JSONEncoder(indent=2, default=_json_default, ensure_ascii=False)
+# Buffer di scrittura (1 MiB) per gli output JSON
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Database SQLite per gli output salvati con format="sqlite"
+RESULTS_DB_NAME = "research_results.db"
+
+# Regex precompilate a livello di modulo (non ricompilate ad ogni chiamata)
+_DOMAIN_RE = re.compile(r'https?://(?:www\.)?([^/]+)')
+_SANITIZE_BAD = re.compile(r'[\\/*?:"<>|]')
+_SANITIZE_WS = re.compile(r'[\s\t\n\r]+')
+# Termini significativi: parole di almeno 5 lettere tutte ASCII. Il \b è Unicode,
+# quindi parole accentate come "università" vengono scartate per intero e non
+# troncate a "universit"
+_WORD_PATTERN = r'\b[A-Za-z]{5,}\b'
+if regex is not None:
+    _WORD_RE = regex.compile(_WORD_PATTERN)
+else:
+    _WORD_RE = re.compile(_WORD_PATTERN)
+
+# Sotto questa soglia di finding il costo di avvio dei processi (spawn, ~0.1 s
+# per worker) supera il guadagno: 512 finding richiedono ~0.5 s in sequenza
+PARALLEL_CONNECTIONS_MIN_FINDINGS = 512
+# Da questa soglia le coppie candidate si ricavano dal prodotto matriciale sparso
+SPARSE_OVERLAP_MIN_FINDINGS = 256
+# Numero minimo di termini comuni per una connessione di supporto
+MIN_COMMON_TERMS = 3
+
+# Coppie di termini che indicano posizioni contrastanti
+CONTRADICTING_TERMS = (
+    ("increase", "decrease"),
+    ("growth", "decline"),
+    ("positive", "negative"),
+    ("support", "oppose"),
+    ("agree", "disagree"),
+    ("benefit", "harm"),
+    ("advantage", "disadvantage")
+)
+_CONTRADICTION_WORDS = sorted({term for pair in CONTRADICTING_TERMS for term in pair})
+
+
+def _build_term_matcher():
+    """
+    Costruisce un automa Aho-Corasick sui termini di contrasto; se pyahocorasick
+    non è installato ripiega su un'unica regex in alternanza.
+    """
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for term in _CONTRADICTION_WORDS:
+            automaton.add_word(term, term)
+        automaton.make_automaton()
+        return automaton
+    # Termini più lunghi prima, così "disagree" non viene oscurato da "agree"
+    return re.compile("|".join(
+        re.escape(term) for term in sorted(_CONTRADICTION_WORDS, key=len, reverse=True)
+    ))
+
+
+_TERM_MATCHER = _build_term_matcher()
+# Stessa regex su bytes, per i summary interamente ASCII (scansione più stretta)
+_TERM_MATCHER_BYTES = None if ahocorasick is not None else re.compile(_TERM_MATCHER.pattern.encode("ascii"))
+
+
+def _present_terms(text: str) -> set:
+    """
+    Restituisce l'insieme dei termini di contrasto presenti nel testo,
+    con un'unica scansione.
+    
+    Args:
+        text: Testo già in minuscolo
+        
+    Returns:
+        Insieme dei termini trovati
+    """
+    if ahocorasick is not None:
+        return {term for _, term in _TERM_MATCHER.iter(text)}
+    # La regex non restituisce match sovrapposti ("agree" dentro "disagree"),
+    # quindi si controllano anche i termini contenuti in quelli trovati
+    if text.isascii():
+        found = {m.group(0).decode("ascii") for m in _TERM_MATCHER_BYTES.finditer(text.encode("ascii"))}
+    else:
+        found = {m.group(0) for m in _TERM_MATCHER.finditer(text)}
+    return {term for term in _CONTRADICTION_WORDS if any(term in f for f in found)}
+
 
 def setup_logging(log_level: str = "INFO") -> None:
     """
@@ -38,29 +184,87 @@ def setup_logging(log_level: str = "INFO") -> None:
     logger.info(f"Logging configured with level: {log_level}")
 
 
-def save_research_output(output: Dict[str, Any], directory: str = "research_results") -> str:
+def _dumps_compact(output: Dict[str, Any]) -> bytes:
+    """Serializza l'output in JSON compatto (senza indentazione) come bytes."""
+    if orjson is not None:
+        return orjson.dumps(output, option=_ORJSON_OPTIONS, default=_json_default)
+    return json.dumps(
+        output, default=_json_default, separators=(",", ":"), ensure_ascii=False
+    ).encode("utf-8")
+
+
+def save_research_output(
+    output: Dict[str, Any],
+    directory: str = "research_results",
+    format: Literal["json", "msgpack", "sqlite"] = "json",
+    human_readable: bool = False
+) -> str:
     """
-    Save research output to a JSON file.
+    Save research output to a file.
     
     Args:
         output: Research output data
         directory: Directory to save the file
+        format: "json" for an indented JSON file (default), "msgpack" for a
+            compact binary file, "sqlite" for one row per task in
+            RESULTS_DB_NAME inside the directory
+        human_readable: Use a YYYYmmdd_HHMMSS timestamp in the filename
+            instead of the (sortable) nanosecond epoch
         
     Returns:
-        Path to the saved file
+        Path to the saved file (the database file for "sqlite")
     """
-    # Create directory if it doesn't exist
-    os.makedirs(directory, exist_ok=True)
+    # Create directory if it doesn't exist (checked once per directory)
+    if directory not in _DIRS_ENSURED:
+        os.makedirs(directory, exist_ok=True)
+        _DIRS_ENSURED.add(directory)
     
     # Create filename with timestamp and task ID
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    if human_readable:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    else:
+        timestamp = f"{time.time_ns():020d}"
     task_id = output.get("task_id", "unknown")
+    
+    if format == "sqlite":
+        file_path = os.path.join(directory, RESULTS_DB_NAME)
+        with sqlite3.connect(file_path) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results "
+                "(task_id TEXT PRIMARY KEY, ts TEXT, payload BLOB)"
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO results (task_id, ts, payload) VALUES (?, ?, ?)",
+                (str(task_id), timestamp, _dumps_compact(output))
+            )
+        conn.close()
+        logger.info(f"Research output {task_id} saved to {file_path}")
+        return file_path
+    
+    if format == "msgpack":
+        if msgpack is None:
+            raise ImportError("msgpack non è installato: usare format='json' o 'sqlite'")
+        file_path = os.path.join(directory, f"{timestamp}_{task_id}.mp")
+        with open(file_path, 'wb') as f:
+            f.write(msgpack.packb(output, default=_json_default, use_bin_type=True))
+        logger.info(f"Research output saved to {file_path}")
+        return file_path
+    
     filename = f"{timestamp}_{task_id}.json"
     file_path = os.path.join(directory, filename)
     
     # Save the file
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(output, f, indent=2, default=str)
+    if orjson is not None:
+        with open(file_path, 'wb') as f:
+            f.write(orjson.dumps(
+                output,
+                option=orjson.OPT_INDENT_2 | _ORJSON_OPTIONS,
+                default=_json_default
+            ))
+    else:
+        with open(file_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+            for chunk in _JSON_ENCODER.iterencode(output):
+                f.write(chunk)
     
     logger.info(f"Research output saved to {file_path}")
     return file_path
@@ -68,7 +272,7 @@ def save_research_output(output: Dict[str, Any], directory: str = "research_resu
 
 def load_research_output(file_path: str) -> Dict[str, Any]:
     """
-    Load research output from a JSON file.
+    Load research output from a JSON (or msgpack ".mp") file.
     
     Args:
         file_path: Path to the JSON file
@@ -77,8 +281,17 @@ def load_research_output(file_path: str) -> Dict[str, Any]:
         Research output data
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        if file_path.endswith(".mp"):
+            if msgpack is None:
+                raise ImportError("msgpack non è installato")
+            with open(file_path, 'rb') as f:
+                data = msgpack.unpackb(f.read(), raw=False)
+        elif orjson is not None:
+            with open(file_path, 'rb') as f:
+                data = orjson.loads(f.read())
+        else:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
         
         logger.info(f"Research output loaded from {file_path}")
         return data
@@ -87,86 +300,236 @@ def load_research_output(file_path: str) -> Dict[str, Any]:
         return {}
 
 
+def load_research_output_from_db(task_id: str, directory: str = "research_results") -> Dict[str, Any]:
+    """
+    Load a single research output saved with format="sqlite".
+    
+    Args:
+        task_id: ID of the task to load
+        directory: Directory containing the results database
+        
+    Returns:
+        Research output data, or an empty dict if not found
+    """
+    db_path = os.path.join(directory, RESULTS_DB_NAME)
+    try:
+        conn = sqlite3.connect(db_path)
+        try:
+            row = conn.execute(
+                "SELECT payload FROM results WHERE task_id = ?", (str(task_id),)
+            ).fetchone()
+        finally:
+            conn.close()
+        
+        if row is None:
+            logger.warning(f"Research output {task_id} not found in {db_path}")
+            return {}
+        
+        data = orjson.loads(row[0]) if orjson is not None else json.loads(row[0])
+        logger.info(f"Research output {task_id} loaded from {db_path}")
+        return data
+    except Exception as e:
+        logger.error(f"Error loading research output: {str(e)}")
+        return {}
+
+
+def _significant_terms(text: str) -> set:
+    """
+    Extract the set of significant terms (all-ASCII words of 5+ letters).
+    
+    Uses _WORD_RE, backed by the regex module if available.
+    
+    Args:
+        text: Lowercase text to tokenize
+        
+    Returns:
+        Set of significant terms
+    """
+    return set(_WORD_RE.findall(text))
+
+
+def _analyze_pair(
+    i: int,
+    j: int,
+    sources: List[str],
+    present: List[set],
+    word_sets: List[set]
+) -> List[ConnectionRecord]:
+    """
+    Analyze a single pair of findings using precomputed per-finding data.
+    
+    Args:
+        i: Index of the first finding
+        j: Index of the second finding
+        sources: Source of each finding
+        present: Contrasting terms present in each summary
+        word_sets: Significant key-point terms of each finding
+        
+    Returns:
+        Connections found between the two findings (possibly empty)
+    """
+    connections = []
+    source1 = sources[i]
+    source2 = sources[j]
+    
+    # Check for contradictions
+    # This is a very simplified approach; summaries that are empty or
+    # contain no contrasting term are skipped outright
+    present1 = present[i]
+    present2 = present[j]
+    if present1 and present2:
+        hit = next(
+            (
+                (term1, term2) for term1, term2 in CONTRADICTING_TERMS
+                if (term1 in present1 and term2 in present2) or
+                   (term1 in present2 and term2 in present1)
+            ),
+            None
+        )
+        if hit:
+            connections.append(ConnectionRecord(
+                source1, source2, "contrasto", 0.7,
+                f"Contrasting views on {hit[0]}/{hit[1]}"
+            ))
+    
+    # Check for support/reinforcement
+    # Count common key terms as indicator of supporting information
+    common_terms = word_sets[i] & word_sets[j]
+    
+    # If enough common terms, consider it a supporting connection.
+    # Termini ordinati: l'ordine di un set dipende dall'hash seed, diverso in
+    # ogni worker spawn
+    if len(common_terms) >= MIN_COMMON_TERMS:
+        connections.append(ConnectionRecord(
+            source1, source2, "supporto",
+            min(1.0, 0.4 + (len(common_terms) * 0.1)),
+            f"Supporting information on: {', '.join(sorted(common_terms)[:3])}"
+        ))
+    
+    return connections
+
+
+# Dati condivisi in sola lettura dai worker del process pool
+_PAIR_DATA: Optional[Tuple[List[str], List[set], List[set]]] = None
+
+
+def _init_pair_worker(sources: List[str], present: List[set], word_sets: List[set]) -> None:
+    """Initializer del worker: riceve i dati una volta sola, non ad ogni coppia."""
+    global _PAIR_DATA
+    _PAIR_DATA = (sources, present, word_sets)
+
+
+def _analyze_pair_shared(i: int, j: int) -> List[ConnectionRecord]:
+    """Esegue _analyze_pair sui dati condivisi del worker."""
+    return _analyze_pair(i, j, *_PAIR_DATA)
+
+
+def _candidate_pairs(present: List[set], word_sets: List[set]) -> Optional[List[Tuple[int, int]]]:
+    """
+    Restrict the pair scan to pairs that can produce a connection.
+    
+    The term overlap of every pair comes from one sparse product M @ M.T of
+    the (findings x vocabulary) incidence matrix; contradictions are only
+    possible between findings whose summary contains a contrasting term.
+    
+    Args:
+        present: Contrasting terms present in each summary
+        word_sets: Significant key-point terms of each finding
+        
+    Returns:
+        Sorted (i, j) pairs with i < j, or None if scipy is not installed
+    """
+    if sparse is None:
+        return None
+    
+    vocab: Dict[str, int] = {}
+    rows: List[int] = []
+    cols: List[int] = []
+    for i, words in enumerate(word_sets):
+        for word in words:
+            rows.append(i)
+            cols.append(vocab.setdefault(word, len(vocab)))
+    
+    n = len(word_sets)
+    incidence = sparse.csr_matrix(
+        ([1] * len(rows), (rows, cols)), shape=(n, max(len(vocab), 1)), dtype="int32"
+    )
+    overlap = (incidence @ incidence.T).tocoo()
+    mask = (overlap.row < overlap.col) & (overlap.data >= MIN_COMMON_TERMS)
+    candidates = set(zip(overlap.row[mask].tolist(), overlap.col[mask].tolist()))
+    
+    with_terms = [i for i, terms in enumerate(present) if terms]
+    candidates.update(combinations(with_terms, 2))
+    return sorted(candidates)
+
+
 def identify_connections(findings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
     Identify connections between different findings.
     
+    Large finding sets are split across a process pool, since every pair
+    is independent and the scan is CPU-bound.
+    
     Args:
         findings: List of content findings
         
     Returns:
-        List of connection descriptions
+        List of connections
     """
     logger.info(f"Identifying connections between {len(findings)} findings")
     
-    connections = []
-    
     # This is a simplified implementation
     # In a real-world scenario, this would use more sophisticated NLP techniques
     
-    # Compare each pair of findings
-    for i, finding1 in enumerate(findings):
-        for j, finding2 in enumerate(findings):
-            if i >= j:  # Skip self-comparisons and duplicates
-                continue
-                
-            source1 = finding1.get("source", "")
-            source2 = finding2.get("source", "")
-            
-            # Check for contradictions
-            # This is a very simplified approach
-            contradicting_terms = [
-                ("increase", "decrease"),
-                ("growth", "decline"),
-                ("positive", "negative"),
-                ("support", "oppose"),
-                ("agree", "disagree"),
-                ("benefit", "harm"),
-                ("advantage", "disadvantage")
-            ]
-            
-            content1 = finding1.get("summary", "") or ""
-            content2 = finding2.get("summary", "") or ""
-            
-            # Check for contradictions
-            for term1, term2 in contradicting_terms:
-                if (term1 in content1.lower() and term2 in content2.lower()) or \
-                   (term1 in content2.lower() and term2 in content1.lower()):
-                    connections.append({
-                        "source": source1,
-                        "target": source2,
-                        "relation": "contrasto",
-                        "strength": 0.7,
-                        "description": f"Contrasting views on {term1}/{term2}"
-                    })
-                    break
-            
-            # Check for support/reinforcement
-            # Count common key terms as indicator of supporting information
-            common_terms = set()
-            for key_point1 in finding1.get("key_points", []):
-                kp_text1 = key_point1.get("text", "").lower() if isinstance(key_point1, dict) else ""
-                for key_point2 in finding2.get("key_points", []):
-                    kp_text2 = key_point2.get("text", "").lower() if isinstance(key_point2, dict) else ""
-                    
-                    # Extract significant terms (nouns, proper nouns)
-                    words1 = re.findall(r'\b[A-Za-z]{4,}\b', kp_text1)
-                    words2 = re.findall(r'\b[A-Za-z]{4,}\b', kp_text2)
-                    
-                    # Find common significant terms
-                    for word in words1:
-                        if word in words2 and len(word) > 4:
-                            common_terms.add(word)
-            
-            # If enough common terms, consider it a supporting connection
-            if len(common_terms) >= 3:
-                connections.append({
-                    "source": source1,
-                    "target": source2,
-                    "relation": "supporto",
-                    "strength": min(1.0, 0.4 + (len(common_terms) * 0.1)),
-                    "description": f"Supporting information on: {', '.join(list(common_terms)[:3])}"
-                })
+    # Precalcola una sola volta, per ogni finding, il summary e i testi dei
+    # key point in minuscolo e l'insieme dei termini significativi (>4 caratteri)
+    sources = [f.get("source", "") for f in findings]
+    summaries_lower = [(f.get("summary", "") or "").lower() for f in findings]
+    present = [_present_terms(summary) for summary in summaries_lower]
+    kp_texts_lower = [
+        [kp.get("text", "").lower() for kp in f.get("key_points", []) if isinstance(kp, dict)]
+        for f in findings
+    ]
+    word_sets = [_significant_terms(" ".join(texts)) for texts in kp_texts_lower]
+    
+    n = len(findings)
+    results = None
+    
+    # Compare each pair of findings (only i < j, no self-comparisons or duplicates)
+    pairs = None
+    if n >= SPARSE_OVERLAP_MIN_FINDINGS:
+        pairs = _candidate_pairs(present, word_sets)
+    if pairs is None:
+        pairs = list(combinations(range(n), 2))
+    
+    workers = os.cpu_count() or 1
+    # Con un solo core il pool aggiunge solo il costo di avvio e di pickling
+    if n >= PARALLEL_CONNECTIONS_MIN_FINDINGS and pairs and workers >= 2:
+        firsts, seconds = zip(*pairs)
+        try:
+            # spawn: fork dal processo di Streamlit/Prefect (thread e event loop
+            # attivi) può bloccare i worker
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=get_context("spawn"),
+                initializer=_init_pair_worker,
+                initargs=(sources, present, word_sets)
+            ) as executor:
+                results = list(executor.map(
+                    _analyze_pair_shared, firsts, seconds,
+                    chunksize=max(1, len(pairs) // (10 * workers))
+                ))
+        except (OSError, BrokenProcessPool) as e:
+            logger.warning(f"Process pool non disponibile, analisi sequenziale: {str(e)}")
+    
+    if results is None:
+        results = [
+            _analyze_pair(i, j, sources, present, word_sets)
+            for i, j in pairs
+        ]
+    
+    # Dict al confine pubblico: la forma serializzata non dipende dal serializer
+    connections = [connection._asdict() for pair in results for connection in pair]
     
     logger.info(f"Identified {len(connections)} connections")
     return connections
@@ -203,8 +566,7 @@ def extract_domain(url: str) -> str:
     Returns:
         Domain name
     """
-    domain_pattern = re.compile(r'https?://(?:www\.)?([^/]+)')
-    match = domain_pattern.search(url)
+    match = _DOMAIN_RE.search(url)
     
     if match:
         return match.group(1)
@@ -222,9 +584,9 @@ def sanitize_filename(filename: str) -> str:
         Sanitized filename
     """
     # Remove invalid characters
-    sanitized = re.sub(r'[\\/*?:"<>|]', '', filename)
+    sanitized = _SANITIZE_BAD.sub('', filename)
     # Replace spaces and other characters with underscores
-    sanitized = re.sub(r'[\s\t\n\r]+', '_', sanitized)
+    sanitized = _SANITIZE_WS.sub('_', sanitized)
     # Limit length
     sanitized = sanitized[:100]
     
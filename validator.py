@@ -9,18 +9,60 @@ Utilizza DeepSeek via Ollama (con fallback a Gemini) per:
 4. Validare le fonti citate
 """
 
+import asyncio
 import json
 import logging
+import os
+import sqlite3
+import threading
+from contextlib import aclosing
+from datetime import datetime
+from hashlib import blake2b
 from typing import Dict, Any, List, Optional, Union, Tuple
 import re
 
 from model_adapter import ModelAdapter, ModelType
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
 # Configurazione del logger
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+    logging.warning("sentence-transformers non è disponibile. La cache di validazione userà solo chiavi esatte.")
+
+try:
+    from pybloom_live import ScalableBloomFilter
+except ImportError:
+    ScalableBloomFilter = None
+
+# Configurazione della cache delle validazioni (database fuori dal sorgente, vedi .gitignore)
+VALIDATION_CACHE_PATH = os.environ.get(
+    "VALIDATION_CACHE_PATH", os.path.join(".cache", "validation_cache.db")
+)
+VALIDATION_CACHE_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+VALIDATION_CACHE_SIMILARITY = 0.97  # Similarità coseno minima per un hit semantico
+VALIDATION_CACHE_INITIAL_ROWS = 64  # Righe preallocate per la matrice degli embedding
+VALIDATION_BLOOM_CAPACITY = 10000
+VALIDATION_BLOOM_ERROR_RATE = 0.001
+VALIDATION_CACHE_WRITE_BATCH = 32         # Scritture su disco per transazione
+
+# Configurazione delle validazioni in batch
+VALIDATOR_BATCH_MAX_ITEMS = 8             # Item massimi per singolo prompt
+VALIDATOR_BATCH_MAX_INPUT_TOKENS = 3000   # Budget (stimato) dei contenuti per prompt
+
+# Pattern precompilati per l'estrazione degli URL dal markdown
+_MD_LINK_RE = re.compile(r'\[.*?\]\((https?://[^\s)]+)\)')
+_URL_RE = re.compile(r'(?<!\()(https?://[^\s)]+)(?![\w\s]*[\)])')
+
+# Memo degli URL estratti, indicizzato da (lunghezza, hash) del testo; FIFO
+URL_CACHE_MAXSIZE = 1024
+_URL_CACHE: Dict[Tuple[int, int], Tuple[str, ...]] = {}
+
 # Schema per la validazione
 class ValidationCriteria(BaseModel):
     """Criteri per la validazione dei contenuti."""
@@ -57,21 +99,380 @@ class ContentValidation(BaseModel):
     new_content: Optional[str] = None
     validation_date: str
 
-# Prompt template per il Validator
-VALIDATOR_PROMPT_TEMPLATE = """
-# Istruzioni per la Validazione di Contenuto di Ricerca
+# Adapter con schema e validatore compilati una sola volta
+_VALIDATION_ADAPTER = TypeAdapter(ContentValidation)
 
-Sei un rigoroso validatore di contenuti di ricerca con un'attenzione particolare all'accuratezza e alla verità. 
-Il tuo compito è analizzare il seguente contenuto di ricerca, verificarne la qualità e identificare eventuali problemi.
 
-## Domanda di ricerca:
-{question}
+class _JsonObjectScanner:
+    """
+    Scanner incrementale del primo oggetto (o lista) JSON bilanciato in un testo.
+    
+    Conta le parentesi ignorando quelle dentro le stringhe (con i relativi
+    escape); il testo può arrivare a pezzi (streaming) e ogni carattere viene
+    esaminato una sola volta.
+    """
+    
+    def __init__(self, opener: str = "{", closer: str = "}"):
+        """
+        Args:
+            opener: Parentesi di apertura del valore cercato ("{" o "[")
+            closer: Parentesi di chiusura corrispondente
+        """
+        self.opener = opener
+        self.closer = closer
+        self.buffer = ""
+        self._pos = 0
+        self._start = -1
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+    
+    def feed(self, chunk: str) -> Optional[str]:
+        """
+        Aggiunge testo e prosegue la scansione.
+        
+        Args:
+            chunk: Nuovo frammento di testo
+            
+        Returns:
+            Il valore JSON completo appena si chiude, altrimenti None
+        """
+        self.buffer += chunk
+        s = self.buffer
+        if self._start < 0:
+            start = s.find(self.opener, self._pos)
+            if start < 0:
+                self._pos = len(s)
+                return None
+            self._start = self._pos = start
+        
+        for i in range(self._pos, len(s)):
+            ch = s[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == self.opener:
+                self._depth += 1
+            elif ch == self.closer:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._pos = i + 1
+                    return s[self._start:i + 1]
+        self._pos = len(s)
+        return None
 
-## Contenuto da validare:
-{content}
 
-## Fonti citate:
-{sources}
+def _extract_first_json_object(s: str) -> Optional[str]:
+    """
+    Estrae il primo oggetto JSON bilanciato da un testo, in un'unica passata.
+    
+    Il testo prima o dopo l'oggetto (anche se contiene parentesi) non lo altera.
+    
+    Args:
+        s: Testo della risposta del modello
+        
+    Returns:
+        La porzione dalla prima "{" di primo livello alla "}" corrispondente,
+        o None se non c'è un oggetto completo
+    """
+    return _JsonObjectScanner().feed(s)
+
+
+class ValidationCache:
+    """
+    Cache delle validazioni, persistita su SQLite.
+    
+    Il primo livello è un dizionario indicizzato dall'hash blake2b della chiave
+    canonica (domanda, contenuto, fonti ordinate); se sentence-transformers è
+    installato, un secondo livello cerca validazioni di input quasi identici
+    tramite similarità coseno degli embedding.
+    
+    Davanti al livello semantico c'è un filtro di Bloom delle domande già in
+    cache: se la domanda non è mai stata vista, il miss è certo e si evita il
+    calcolo dell'embedding.
+    
+    Dentro un event loop le scritture su disco non bloccano il chiamante: sono
+    accodate e un'unica coroutine le salva a gruppi, una transazione per gruppo.
+    Dal codice asincrono si usano aget/aput, che calcolano gli embedding in un
+    thread invece di bloccare l'event loop.
+    """
+    
+    def __init__(
+        self,
+        db_path: str = VALIDATION_CACHE_PATH,
+        similarity_threshold: float = VALIDATION_CACHE_SIMILARITY,
+        semantic: bool = True
+    ):
+        """
+        Inizializza la cache e carica le voci già persistite.
+        
+        Args:
+            db_path: Percorso del database SQLite (":memory:" per non persistere)
+            similarity_threshold: Similarità coseno minima per un hit semantico
+            semantic: Se False, usa solo le chiavi esatte
+        """
+        self.similarity_threshold = similarity_threshold
+        self.semantic = semantic and SentenceTransformer is not None
+        self._lock = threading.Lock()
+        self._entries: Dict[str, str] = {}  # {hash chiave: JSON della validazione}
+        self._encoder = None
+        self._encoder_lock = threading.Lock()
+        self._keys: List[str] = []          # hash allineati alle righe di _matrix
+        # Embedding normalizzati: le prime len(_keys) righe sono valide, la
+        # capacità raddoppia quando si esaurisce (inserimento O(1) ammortizzato)
+        self._matrix = None
+        # Hash delle domande con almeno una voce semantica; senza pybloom_live
+        # un set esatto svolge lo stesso ruolo
+        if ScalableBloomFilter is not None:
+            self._questions = ScalableBloomFilter(
+                initial_capacity=VALIDATION_BLOOM_CAPACITY,
+                error_rate=VALIDATION_BLOOM_ERROR_RATE
+            )
+        else:
+            self._questions = set()
+        self._questions_complete = True     # False se alcune voci non hanno la domanda
+        
+        self._db_lock = threading.Lock()
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._writer_loop = None
+        
+        db_dir = os.path.dirname(db_path)
+        if db_path != ":memory:" and db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        # WAL: le letture non attendono le scritture e i commit non forzano fsync
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS validation_cache "
+            "(key TEXT PRIMARY KEY, payload TEXT NOT NULL, embedding BLOB, question_key TEXT)"
+        )
+        try:
+            # Database creati prima dell'introduzione del filtro
+            self._conn.execute("ALTER TABLE validation_cache ADD COLUMN question_key TEXT")
+        except sqlite3.OperationalError:
+            pass
+        self._conn.commit()
+        
+        embeddings = []
+        for key, payload, embedding, question_key in self._conn.execute(
+            "SELECT key, payload, embedding, question_key FROM validation_cache"
+        ):
+            self._entries[key] = payload
+            if self.semantic and embedding is not None:
+                self._keys.append(key)
+                embeddings.append(np.frombuffer(embedding, dtype=np.float32))
+                if question_key is None:
+                    self._questions_complete = False
+                else:
+                    self._questions.add(question_key)
+        if embeddings:
+            self._matrix = np.vstack(embeddings)
+        
+        logger.info(f"ValidationCache inizializzata con {len(self._entries)} voci")
+    
+    @staticmethod
+    def canonical_key(question: str, content: str, sources: List[str]) -> str:
+        """
+        Costruisce la chiave canonica di una validazione.
+        
+        Spazi ridondanti e ordine delle fonti non cambiano la chiave; task_id e
+        content_id ne sono esclusi perché non influiscono sul giudizio.
+        
+        Args:
+            question: Domanda di ricerca
+            content: Contenuto da validare
+            sources: Fonti citate
+            
+        Returns:
+            Chiave canonica
+        """
+        return "\n".join((
+            " ".join(question.split()),
+            " ".join(content.split()),
+            "\n".join(sorted(source.strip() for source in sources))
+        ))
+    
+    @staticmethod
+    def hash_key(canonical: str) -> str:
+        """Hash blake2b (128 bit) della chiave canonica."""
+        return blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+    
+    @classmethod
+    def question_key(cls, canonical: str) -> str:
+        """Hash della sola domanda (prima riga della chiave canonica)."""
+        return cls.hash_key(canonical.partition("\n")[0])
+    
+    def _embed(self, canonical: str):
+        """Calcola l'embedding normalizzato della chiave canonica."""
+        with self._encoder_lock:
+            if self._encoder is None:
+                self._encoder = SentenceTransformer(VALIDATION_CACHE_EMBEDDING_MODEL)
+        return self._encoder.encode(canonical, normalize_embeddings=True).astype(np.float32)
+    
+    def _lookup(self, canonical: str) -> Tuple[Optional[str], bool]:
+        """
+        Livelli senza embedding: chiave esatta e filtro delle domande.
+        
+        Returns:
+            (JSON della validazione o None, True se serve la ricerca semantica)
+        """
+        with self._lock:
+            payload = self._entries.get(self.hash_key(canonical))
+            if payload is not None or not self.semantic or self._matrix is None:
+                return payload, False
+            if self._questions_complete and self.question_key(canonical) not in self._questions:
+                return None, False
+        return None, True
+    
+    def _semantic_lookup(self, embedding) -> Optional[str]:
+        """Cerca la voce più simile all'embedding dato, sopra la soglia."""
+        with self._lock:
+            # Vista sulle righe valide: le righe successive sono capacità libera
+            matrix, keys = self._matrix[:len(self._keys)], self._keys[:]
+        
+        scores = matrix @ embedding
+        best = int(scores.argmax())
+        if scores[best] >= self.similarity_threshold:
+            logger.debug(f"Hit semantico nella cache di validazione (similarità {scores[best]:.3f})")
+            return self._entries.get(keys[best])
+        return None
+    
+    def get(self, canonical: str) -> Optional[str]:
+        """
+        Cerca una validazione in cache.
+        
+        Args:
+            canonical: Chiave canonica
+            
+        Returns:
+            JSON della validazione, o None se assente
+        """
+        payload, semantic = self._lookup(canonical)
+        if not semantic:
+            return payload
+        return self._semantic_lookup(self._embed(canonical))
+    
+    async def aget(self, canonical: str) -> Optional[str]:
+        """Come get, ma calcola l'embedding in un thread senza bloccare l'event loop."""
+        payload, semantic = self._lookup(canonical)
+        if not semantic:
+            return payload
+        return self._semantic_lookup(await asyncio.to_thread(self._embed, canonical))
+    
+    def _append_embedding(self, key: str, embedding) -> None:
+        """Aggiunge una riga alla matrice degli embedding (da chiamare con _lock)."""
+        size = len(self._keys)
+        if self._matrix is None:
+            self._matrix = np.empty((VALIDATION_CACHE_INITIAL_ROWS, embedding.shape[0]), dtype=np.float32)
+        elif size == self._matrix.shape[0]:
+            grown = np.empty((size * 2, self._matrix.shape[1]), dtype=np.float32)
+            grown[:size] = self._matrix
+            self._matrix = grown
+        self._matrix[size] = embedding
+        self._keys.append(key)
+    
+    def put(self, canonical: str, payload: str, embedding=None) -> None:
+        """
+        Salva una validazione in cache e su disco.
+        
+        Dentro un event loop la scrittura su disco viene accodata (vedi flush).
+        
+        Args:
+            canonical: Chiave canonica
+            payload: JSON della validazione
+            embedding: Embedding già calcolato della chiave (opzionale)
+        """
+        key = self.hash_key(canonical)
+        question_key = self.question_key(canonical)
+        if self.semantic and embedding is None:
+            embedding = self._embed(canonical)
+        elif not self.semantic:
+            embedding = None
+        with self._lock:
+            if self.semantic and key not in self._entries:
+                self._append_embedding(key, embedding)
+                self._questions.add(question_key)
+            self._entries[key] = payload
+        
+        row = (key, payload, embedding.tobytes() if embedding is not None else None, question_key)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write_rows([row])
+            return
+        
+        if self._writer_loop is not loop or self._writer.done():
+            self._queue = asyncio.Queue()
+            self._writer_loop = loop
+            self._writer = loop.create_task(self._write_loop(self._queue))
+        self._queue.put_nowait(row)
+    
+    async def aput(self, canonical: str, payload: str) -> None:
+        """Come put, ma calcola l'embedding in un thread senza bloccare l'event loop."""
+        embedding = await asyncio.to_thread(self._embed, canonical) if self.semantic else None
+        self.put(canonical, payload, embedding)
+    
+    def _write_rows(self, rows: List[Tuple[str, str, Optional[bytes], str]]) -> None:
+        """Salva un gruppo di voci in un'unica transazione."""
+        with self._db_lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO validation_cache (key, payload, embedding, question_key) "
+                "VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+    
+    async def _write_loop(self, queue: asyncio.Queue) -> None:
+        """
+        Svuota la coda delle scritture, fino a VALIDATION_CACHE_WRITE_BATCH voci per transazione.
+        
+        Alla cancellazione (es. chiusura dell'event loop) le voci ancora in coda
+        vengono salvate in modo sincrono.
+        
+        Args:
+            queue: Coda delle voci da salvare
+        """
+        try:
+            while True:
+                rows = [await queue.get()]
+                while len(rows) < VALIDATION_CACHE_WRITE_BATCH and not queue.empty():
+                    rows.append(queue.get_nowait())
+                try:
+                    await asyncio.to_thread(self._write_rows, rows)
+                except sqlite3.Error as e:
+                    logger.error(f"Errore nel salvataggio della cache di validazione: {str(e)}")
+                for _ in rows:
+                    queue.task_done()
+        finally:
+            rows = []
+            while not queue.empty():
+                rows.append(queue.get_nowait())
+                queue.task_done()
+            if rows:
+                self._write_rows(rows)
+    
+    async def flush(self) -> None:
+        """Attende che tutte le scritture accodate siano su disco."""
+        if self._queue is not None and self._writer_loop is asyncio.get_running_loop():
+            await self._queue.join()
+
+
+# Prompt del Validator. Le parti statiche (istruzioni, criteri, schema di output)
+# precedono tutti i campi dinamici, così il prefisso resta identico tra le
+# chiamate e può essere riutilizzato dalla cache dei prefissi del provider.
+VALIDATOR_STATIC_PREFIX = """
+# Istruzioni per la Validazione di Contenuto di Ricerca
+
+Sei un rigoroso validatore di contenuti di ricerca con un'attenzione particolare all'accuratezza e alla verità. 
+Il tuo compito è analizzare il contenuto di ricerca fornito nella sezione "Input" in fondo, verificarne la qualità e identificare eventuali problemi.
 
 ## Criteri di validazione:
 1. **Accuratezza fattuale** - Le informazioni sono corrette e verificabili?
@@ -89,31 +490,32 @@ Il tuo compito è analizzare il seguente contenuto di ricerca, verificarne la qu
 6. Se necessario, fornisci una versione corretta del contenuto
 
 ## Output:
-Fornisci il risultato della validazione in formato JSON con la seguente struttura:
-{{
-  "task_id": "{task_id}",
-  "content_id": "{content_id}",
+Fornisci il risultato della validazione in formato JSON con la seguente struttura,
+sostituendo <TASK_ID> e <CONTENT_ID> con i valori indicati nell'Input:
+{
+  "task_id": "<TASK_ID>",
+  "content_id": "<CONTENT_ID>",
   "validation_passed": true/false,
   "overall_score": 0.0-1.0,
-  "criteria_scores": {{
+  "criteria_scores": {
     "factual_accuracy": 0.0-1.0,
     "source_validity": 0.0-1.0,
     "content_relevance": 0.0-1.0,
     "internal_consistency": 0.0-1.0,
     "citation_validity": 0.0-1.0
-  }},
+  },
   "issues_found": [
     "Descrizione problema 1",
     "Descrizione problema 2",
     ...
   ],
   "sources_validation": [
-    {{
+    {
       "source": "URL1",
       "is_valid": true/false,
       "relevance_score": 0.0-1.0,
       "comments": "Commento sulla fonte"
-    }},
+    },
     ...
   ],
   "improvement_suggestions": [
@@ -123,10 +525,47 @@ Fornisci il risultato della validazione in formato JSON con la seguente struttur
   ],
   "new_content": "Versione corretta del contenuto, se necessario",
   "validation_date": "Data ISO della validazione"
-}}
+}
 
 IMPORTANTE: Sii estremamente critico e rigoroso. È meglio segnalare un potenziale problema che ignorarlo.
 Se identifichi allucinazioni o informazioni non verificabili, assegna punteggi bassi e suggerisci correzioni.
+
+Il tuo output deve essere in formato JSON secondo il seguente schema:
+""" + json.dumps(_VALIDATION_ADAPTER.json_schema(), indent=2)
+
+VALIDATOR_DYNAMIC_SUFFIX = """
+
+## Input
+TASK_ID: {task_id}
+CONTENT_ID: {content_id}
+
+### Domanda di ricerca:
+{question}
+
+### Contenuto da validare:
+{content}
+
+### Fonti citate:
+{sources}
+"""
+
+# Coda del prompt per validare più contenuti della stessa domanda in una sola
+# chiamata; il prefisso statico resta lo stesso della validazione singola.
+VALIDATOR_BATCH_PROMPT_TEMPLATE = """
+
+## Input
+Questa volta la sezione contiene più contenuti da validare ("items"), tutti
+relativi alla stessa domanda di ricerca. Valida ciascun item separatamente.
+
+### Domanda di ricerca:
+{question}
+
+## Items
+{items}
+
+## Output: list of ContentValidation JSON objects
+Rispondi con una lista JSON [...] contenente un oggetto di validazione per
+ciascun item, nello stesso ordine, con i rispettivi task_id e content_id.
 """
 
 class ContentValidator:
@@ -135,9 +574,15 @@ class ContentValidator:
     Utilizza un LLM per verificare l'accuratezza e la pertinenza dei contenuti generati.
     """
     
-    def __init__(self):
-        """Inizializza il validatore con l'adattatore del modello."""
+    def __init__(self, cache: Optional[ValidationCache] = None):
+        """
+        Inizializza il validatore con l'adattatore del modello.
+        
+        Args:
+            cache: Cache delle validazioni (default: ValidationCache su VALIDATION_CACHE_PATH)
+        """
         self.model = ModelAdapter()
+        self.cache = cache if cache is not None else ValidationCache()
         logger.info("ContentValidator inizializzato")
         
         # Verifica la disponibilità dei modelli
@@ -149,7 +594,7 @@ class ContentValidator:
         else:
             logger.info("Utilizzo Gemini per la validazione (fallback)")
     
-    def validate_content(
+    async def validate_content(
         self, 
         task_id: str,
         content_id: str,
@@ -178,9 +623,20 @@ class ContentValidator:
         if criteria is None:
             criteria = ValidationCriteria()
         
+        # Validazioni già eseguite su input equivalenti non richiedono il modello
+        canonical = ValidationCache.canonical_key(question, content, sources)
+        cached = await self.cache.aget(canonical)
+        if cached is not None:
+            logger.info(f"Validazione servita dalla cache per: {content_id}")
+            return _VALIDATION_ADAPTER.validate_json(cached).model_copy(update={
+                "task_id": task_id,
+                "content_id": content_id,
+                "validation_date": datetime.now().isoformat()
+            })
+        
         # Preparazione del prompt
         sources_text = "\n".join([f"- {source}" for source in sources])
-        prompt = VALIDATOR_PROMPT_TEMPLATE.format(
+        prompt = VALIDATOR_STATIC_PREFIX + VALIDATOR_DYNAMIC_SUFFIX.format(
             question=question,
             content=content,
             sources=sources_text,
@@ -188,20 +644,14 @@ class ContentValidator:
             content_id=content_id
         )
         
-        # Chiamata al modello
-        result = self.model.generate(
-            prompt=prompt,
-            task_type=ModelType.VALIDATOR,
-            temperature=0.1,  # Temperatura molto bassa per output deterministici
-            max_tokens=4000,
-            format_output=True,
-            output_format=ContentValidation.schema()
-        )
-        
-        if "error" in result and result.get("error"):
-            logger.error(f"Errore nella validazione del contenuto: {result['error']}")
+        # Chiamata al modello in streaming (lo schema di output è già nel prefisso
+        # statico): la lettura si interrompe appena l'oggetto JSON si chiude
+        scanner = _JsonObjectScanner()
+        try:
+            json_str = await self._stream_json(prompt, scanner, max_tokens=4000)
+        except RuntimeError as e:
+            logger.error(f"Errore nella validazione del contenuto: {str(e)}")
             # Crea un risultato minimo in caso di errore
-            from datetime import datetime
             return ContentValidation(
                 task_id=task_id,
                 content_id=content_id,
@@ -214,32 +664,28 @@ class ContentValidator:
                 validation_date=datetime.now().isoformat()
             )
         
-        # Estrai e analizza la risposta JSON
+        # Analizza la risposta JSON
         try:
-            # In alcuni casi, il modello potrebbe rispondere con testo prima o dopo il JSON
-            response_text = result.get("response", "")
-            
-            # Trova l'inizio e la fine del JSON
-            json_start = response_text.find("{")
-            json_end = response_text.rfind("}") + 1
-            
-            if json_start >= 0 and json_end > json_start:
-                json_str = response_text[json_start:json_end]
-                validation_dict = json.loads(json_str)
-                
-                # Valida e crea il risultato
-                validation = ContentValidation(**validation_dict)
+            # Il modello potrebbe rispondere con testo prima o dopo il JSON:
+            # lo scanner restituisce solo il primo oggetto completo
+            if json_str is not None:
+                # Parsing e validazione in un solo passaggio (parser JSON di pydantic-core).
+                # Gli identificativi sono quelli del chiamante, non l'eco del modello
+                validation = _VALIDATION_ADAPTER.validate_json(json_str).model_copy(update={
+                    "task_id": task_id,
+                    "content_id": content_id
+                })
                 logger.info(f"Validazione completata: {validation.validation_passed}")
+                await self.cache.aput(canonical, validation.model_dump_json())
                 return validation
             else:
                 raise ValueError("Nessun JSON valido trovato nella risposta")
                 
         except Exception as e:
             logger.error(f"Errore nella conversione del risultato: {str(e)}")
-            logger.error(f"Risposta raw: {result.get('response', 'Nessuna risposta')}")
+            logger.error(f"Risposta raw: {scanner.buffer or 'Nessuna risposta'}")
             
             # Crea un risultato di fallback
-            from datetime import datetime
             return ContentValidation(
                 task_id=task_id,
                 content_id=content_id,
@@ -252,6 +698,202 @@ class ContentValidator:
                 validation_date=datetime.now().isoformat()
             )
     
+    async def _stream_json(
+        self,
+        prompt: str,
+        scanner: _JsonObjectScanner,
+        max_tokens: int
+    ) -> Optional[str]:
+        """
+        Legge la risposta del modello in streaming fino al primo valore JSON completo.
+        
+        Appena lo scanner lo chiude lo stream viene chiuso, interrompendo la
+        richiesta HTTP; altrimenti si legge fino alla fine della risposta.
+        
+        Args:
+            prompt: Prompt completo
+            scanner: Scanner che accumula il testo ricevuto
+            max_tokens: Numero massimo di token da generare
+            
+        Returns:
+            Il valore JSON trovato, o None
+            
+        Raises:
+            RuntimeError: Se il modello non riesce a generare la risposta
+        """
+        async with aclosing(self.model.generate_stream(
+            prompt=prompt,
+            task_type=ModelType.VALIDATOR,
+            temperature=0.1,  # Temperatura molto bassa per output deterministici
+            max_tokens=max_tokens
+        )) as stream:
+            async for chunk in stream:
+                json_str = scanner.feed(chunk)
+                if json_str is not None:
+                    return json_str
+        return None
+    
+    async def validate_content_batch(
+        self,
+        question: str,
+        items: List[Tuple[str, str, str, List[str]]]
+    ) -> List[ContentValidation]:
+        """
+        Valida più contenuti relativi alla stessa domanda raggruppandoli in pochi prompt.
+        
+        Gli item già in cache non vengono inviati; gli altri sono raggruppati
+        entro VALIDATOR_BATCH_MAX_ITEMS item e VALIDATOR_BATCH_MAX_INPUT_TOKENS
+        token stimati per prompt. Gli item di un batch la cui risposta non è
+        interpretabile vengono rivalidati singolarmente.
+        
+        Args:
+            question: Domanda di ricerca comune
+            items: Tuple (task_id, content_id, content, sources)
+            
+        Returns:
+            Risultati della validazione, nello stesso ordine di items
+        """
+        results: List[Optional[ContentValidation]] = [None] * len(items)
+        batches: List[List[int]] = []
+        batch: List[int] = []
+        batch_tokens = 0
+        
+        for index, (task_id, content_id, content, sources) in enumerate(items):
+            cached = await self.cache.aget(ValidationCache.canonical_key(question, content, sources))
+            if cached is not None:
+                results[index] = _VALIDATION_ADAPTER.validate_json(cached).model_copy(update={
+                    "task_id": task_id,
+                    "content_id": content_id,
+                    "validation_date": datetime.now().isoformat()
+                })
+                continue
+            
+            # Stima grossolana: ~4 caratteri per token
+            tokens = (len(content) + sum(len(source) for source in sources)) // 4
+            if batch and (len(batch) >= VALIDATOR_BATCH_MAX_ITEMS
+                          or batch_tokens + tokens > VALIDATOR_BATCH_MAX_INPUT_TOKENS):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(index)
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        
+        validated = await asyncio.gather(*(
+            self._validate_batch(question, [items[i] for i in indices])
+            for indices in batches
+        ))
+        for indices, validations in zip(batches, validated):
+            for index, validation in zip(indices, validations):
+                results[index] = validation
+        return results
+    
+    async def _validate_batch(
+        self,
+        question: str,
+        items: List[Tuple[str, str, str, List[str]]]
+    ) -> List[ContentValidation]:
+        """
+        Valida un gruppo di item con un solo prompt, con ripiego sulle chiamate singole.
+        
+        Args:
+            question: Domanda di ricerca comune
+            items: Tuple (task_id, content_id, content, sources)
+            
+        Returns:
+            Risultati della validazione, nello stesso ordine di items
+        """
+        if len(items) == 1:
+            task_id, content_id, content, sources = items[0]
+            return [await self.validate_content(
+                task_id=task_id,
+                content_id=content_id,
+                question=question,
+                content=content,
+                sources=sources
+            )]
+        
+        items_text = json.dumps(
+            [
+                {"task_id": task_id, "content_id": content_id, "content": content, "sources": sources}
+                for task_id, content_id, content, sources in items
+            ],
+            ensure_ascii=False,
+            indent=2
+        )
+        prompt = VALIDATOR_STATIC_PREFIX + VALIDATOR_BATCH_PROMPT_TEMPLATE.format(
+            question=question,
+            items=items_text
+        )
+        
+        parsed: List[Any] = []
+        scanner = _JsonObjectScanner("[", "]")
+        try:
+            json_str = await self._stream_json(prompt, scanner, max_tokens=4000 * len(items))
+            if json_str is not None:
+                parsed = json.loads(json_str)
+        except (RuntimeError, ValueError) as e:
+            logger.warning(f"Validazione in batch non riuscita: {str(e)}. Valido gli item singolarmente.")
+        
+        if not isinstance(parsed, list) or len(parsed) != len(items):
+            logger.warning("Risposta del batch non allineata agli item, valido gli item singolarmente")
+            parsed = [None] * len(items)
+        
+        results: List[ContentValidation] = []
+        for (task_id, content_id, content, sources), obj in zip(items, parsed):
+            try:
+                validation = _VALIDATION_ADAPTER.validate_python(obj).model_copy(update={
+                    "task_id": task_id,
+                    "content_id": content_id
+                })
+                await self.cache.aput(
+                    ValidationCache.canonical_key(question, content, sources),
+                    validation.model_dump_json()
+                )
+            except Exception:
+                validation = await self.validate_content(
+                    task_id=task_id,
+                    content_id=content_id,
+                    question=question,
+                    content=content,
+                    sources=sources
+                )
+            results.append(validation)
+        return results
+    
+    async def validate_many(
+        self,
+        items: List[Dict[str, Any]],
+        max_concurrency: int = 8
+    ) -> List[ContentValidation]:
+        """
+        Valida più contenuti in parallelo.
+        
+        Args:
+            items: Argomenti di validate_content per ciascun contenuto
+            max_concurrency: Numero massimo di validazioni in volo contemporaneamente
+            
+        Returns:
+            Risultati della validazione, nello stesso ordine di items
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def bounded(item: Dict[str, Any]) -> ContentValidation:
+            async with semaphore:
+                return await self.validate_content(**item)
+        
+        return await asyncio.gather(*(bounded(item) for item in items))
+    
+    def validate_content_sync(self, *args, **kwargs) -> ContentValidation:
+        """Wrapper sincrono di validate_content, per chiamanti fuori da un event loop."""
+        async def run() -> ContentValidation:
+            try:
+                return await self.validate_content(*args, **kwargs)
+            finally:
+                await self.cache.flush()
+        
+        return asyncio.run(run())
+    
     def extract_urls_from_markdown(self, markdown_text: str) -> List[str]:
         """
         Estrae gli URL da un testo markdown.
@@ -262,17 +904,25 @@ class ContentValidator:
         Returns:
             Lista di URL trovati
         """
-        # Pattern per trovare URL in markdown link
-        markdown_link_pattern = r'\[.*?\]\((https?://[^\s)]+)\)'
-        markdown_links = re.findall(markdown_link_pattern, markdown_text)
+        # Lo stesso contenuto viene spesso analizzato più volte per validazione
+        key = (len(markdown_text), hash(markdown_text))
+        cached = _URL_CACHE.get(key)
+        if cached is not None:
+            return list(cached)
+        
+        # URL in markdown link
+        markdown_links = _MD_LINK_RE.findall(markdown_text)
         
-        # Pattern per trovare URL semplici
-        url_pattern = r'(?<!\()(https?://[^\s)]+)(?![\w\s]*[\)])'
-        direct_urls = re.findall(url_pattern, markdown_text)
+        # URL semplici
+        direct_urls = _URL_RE.findall(markdown_text)
         
         # Unisci i risultati e rimuovi duplicati
-        all_urls = list(set(markdown_links + direct_urls))
-        return all_urls
+        all_urls = tuple(set(markdown_links + direct_urls))
+        if len(_URL_CACHE) >= URL_CACHE_MAXSIZE:
+            # Eviction FIFO: i dict mantengono l'ordine di inserimento
+            _URL_CACHE.pop(next(iter(_URL_CACHE)), None)
+        _URL_CACHE[key] = all_urls
+        return list(all_urls)
     
     def should_retry_task(self, validation: ContentValidation) -> Tuple[bool, str]:
         """
@@ -284,22 +934,23 @@ class ContentValidator:
         Returns:
             Tupla (retry, motivo)
         """
-        # Non superata la validazione
-        if not validation.validation_passed:
-            return True, "Validazione non superata"
+        sources = validation.sources_validation
+        invalid_sources = sum(1 for s in sources if not s.is_valid)
         
-        # Punteggio totale basso
-        if validation.overall_score < 0.6:
-            return True, f"Punteggio totale troppo basso: {validation.overall_score}"
-        
-        # Problemi critici di accuratezza fattuale
-        if validation.criteria_scores.get("factual_accuracy", 1.0) < 0.5:
-            return True, "Gravi problemi di accuratezza fattuale"
-        
-        # Troppe fonti non valide
-        invalid_sources = [s for s in validation.sources_validation if not s.is_valid]
-        if len(invalid_sources) > len(validation.sources_validation) / 2:
-            return True, "Troppe fonti non valide"
+        # Condizioni in ordine di priorità: vince la prima vera
+        reasons = (
+            # Non superata la validazione
+            (not validation.validation_passed, "Validazione non superata"),
+            # Punteggio totale basso
+            (validation.overall_score < 0.6, f"Punteggio totale troppo basso: {validation.overall_score}"),
+            # Problemi critici di accuratezza fattuale
+            (validation.criteria_scores.get("factual_accuracy", 1.0) < 0.5, "Gravi problemi di accuratezza fattuale"),
+            # Troppe fonti non valide (più della metà)
+            (invalid_sources * 2 > len(sources), "Troppe fonti non valide"),
+        )
+        for retry, reason in reasons:
+            if retry:
+                return True, reason
         
         return False, "Validazione superata con successo"
 
@@ -326,7 +977,7 @@ Nel 2023, è stata proposta la **Cyber Resilience Act** che introduce requisiti
         "https://digital-strategy.ec.europa.eu/en/policies/cybersecurity-act"
     ]
     
-    validation = validator.validate_content(
+    validation = validator.validate_content_sync(
         task_id="test_task",
         content_id="test_content",
         question="Come è cambiata la regolamentazione UE sulla cybersecurity dal 2018 al 2023?",
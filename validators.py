@@ -1,14 +1,44 @@
 import logging
 import re
+import time
 from datetime import datetime
 from typing import List, Dict, Any, Tuple, Optional
 
 from models import ContentFinding
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Keywords that signal a references section (matched as whole words, any case)
+REFERENCE_KEYWORDS = ("references", "bibliography", "sources", "citations")
+
+# Sentence terminators ('.', '!', '?') map to 1, every other byte to 0
+_SENTENCE_END_TBL = bytes(1 if b in b'.!?' else 0 for b in range(256))
+
+# Precompiled patterns
+_YEAR_RE = re.compile(r'\b(19\d{2}|20\d{2})\b')
+
+# How often the cached current year is refreshed
+YEAR_REFRESH_SECONDS = 3600
+
+# Content must have more than this many words to count as substantial
+MIN_WORDS = 300
+
+# Below this many year mentions plain Python is faster than numpy
+NUMPY_YEAR_THRESHOLD = 64
+_DIGIT_WEIGHTS = np.array([1000, 100, 10, 1], dtype=np.int32) if np is not None else None
+
 
 class ContentValidator:
     """
@@ -23,6 +53,84 @@ class ContentValidator:
     def __init__(self):
         """Initialize the ContentValidator."""
         logger.debug("Initializing ContentValidator")
+        self._year_bucket = None
+        self._refresh_years()
+    
+    def _refresh_years(self) -> None:
+        """
+        Cache the current year and the recent-year strings.
+        
+        They are recomputed at most once per hour (monotonic clock), so a
+        long-running process still picks up a year change.
+        """
+        bucket = int(time.monotonic() // YEAR_REFRESH_SECONDS)
+        if bucket == self._year_bucket:
+            return
+        self._year_bucket = bucket
+        self._current_year = datetime.now().year
+        self._recent_years_tuple = tuple(
+            str(y) for y in range(self._current_year - 5, self._current_year + 1)
+        )
+        self._signal_matcher = self._build_signal_matcher(self._recent_years_tuple)
+    
+    @staticmethod
+    def _build_signal_matcher(recent_years: Tuple[str, ...]):
+        """
+        Build one matcher for reference keywords and recent years together.
+        
+        An Aho-Corasick automaton when pyahocorasick is installed, otherwise
+        a single alternation regex with one named group per signal.
+        """
+        if ahocorasick is not None:
+            automaton = ahocorasick.Automaton()
+            for keyword in REFERENCE_KEYWORDS:
+                automaton.add_word(keyword, ("references", len(keyword)))
+            for year in recent_years:
+                automaton.add_word(year, ("years", len(year)))
+            automaton.make_automaton()
+            return automaton
+        return re.compile(
+            r'(?P<references>\b(?:' + "|".join(REFERENCE_KEYWORDS) + r')\b)'
+            r'|(?P<years>' + "|".join(recent_years) + ')',
+            re.IGNORECASE
+        )
+    
+    def _scan_signals(self, content: str, needed: int = 2) -> Tuple[bool, bool]:
+        """
+        Look for a references keyword and a recent year in a single pass.
+        
+        Args:
+            content: The content to scan
+            needed: Stop as soon as this many distinct signals have been found
+            
+        Returns:
+            Tuple of (has_references, has_recent_year)
+        """
+        self._refresh_years()
+        found = set()
+        
+        if ahocorasick is not None:
+            text = content.lower()
+            for end, (kind, length) in self._signal_matcher.iter(text):
+                if kind in found:
+                    continue
+                if kind == "references":
+                    # Keywords only count as whole words, like \b in the regex
+                    start = end - length + 1
+                    before = text[start - 1] if start > 0 else " "
+                    after = text[end + 1] if end + 1 < len(text) else " "
+                    if before.isalnum() or before == "_" or after.isalnum() or after == "_":
+                        continue
+                found.add(kind)
+                if len(found) >= needed:
+                    break
+        else:
+            for match in self._signal_matcher.finditer(content):
+                found.add(match.lastgroup)
+                if len(found) >= needed:
+                    break
+        
+        return "references" in found, "years" in found
     
     def validate_content(self, content: str) -> bool:
         """
@@ -40,16 +148,15 @@ class ContentValidator:
             logger.warning("Content validation failed: content too short")
             return False
             
-        # Check for references section
-        has_references = bool(re.search(r'\b(?:References|Bibliography|Sources|Citations)\b', content, re.IGNORECASE))
+        # Check for minimum length: split at most MIN_WORDS times, so long
+        # content is not broken into a full word list just to be counted
+        has_sufficient_length = len(content.split(None, MIN_WORDS)) > MIN_WORDS
         
-        # Check for minimum length
-        has_sufficient_length = len(content.split()) > 300
-        
-        # Check for recency (mentions of recent years)
-        current_year = datetime.now().year
-        recent_years = [str(y) for y in range(current_year-5, current_year+1)]
-        has_recent_content = any(year in content for year in recent_years)
+        # Check for references section and recency (mentions of recent years)
+        # in one pass, stopping as soon as the 2-of-3 outcome is decided
+        has_references, has_recent_content = self._scan_signals(
+            content, needed=1 if has_sufficient_length else 2
+        )
         
         # Count passing checks
         checks_passed = sum([has_references, has_sufficient_length, has_recent_content])
@@ -70,20 +177,23 @@ class ContentValidator:
             The most recent year mentioned, or None if no years found
         """
         # Extract years from text (assuming 4-digit format)
-        year_matches = re.findall(r'\b(19\d{2}|20\d{2})\b', content)
+        year_matches = _YEAR_RE.findall(content)
         
         if not year_matches:
             return None
             
-        # Convert to integers and find the most recent year
-        years = [int(y) for y in year_matches]
-        years.sort(reverse=True)
-        
         # Sanity check - reject future years beyond next year
-        current_year = datetime.now().year
-        valid_years = [y for y in years if y <= current_year + 1]
+        self._refresh_years()
+        max_year = self._current_year + 1
+        
+        if np is not None and len(year_matches) >= NUMPY_YEAR_THRESHOLD:
+            # The matches are fixed-width 4-digit strings: decode them all at once
+            digits = np.frombuffer("".join(year_matches).encode("ascii"), dtype=np.uint8)
+            years = (digits.reshape(-1, 4).astype(np.int32) - ord("0")) @ _DIGIT_WEIGHTS
+            years = years[years <= max_year]
+            return int(years.max()) if years.size else None
         
-        return valid_years[0] if valid_years else None
+        return max((y for y in map(int, year_matches) if y <= max_year), default=None)
     
     def validate_findings(self, findings: List[ContentFinding], min_confidence: float = 0.5) -> Tuple[List[ContentFinding], List[ContentFinding]]:
         """
@@ -98,6 +208,8 @@ class ContentValidator:
         """
         logger.info(f"Validating {len(findings)} findings (min confidence: {min_confidence})")
         
+        self._refresh_years()
+        min_year = self._current_year - 5
         valid_findings = []
         invalid_findings = []
         
@@ -122,7 +234,7 @@ class ContentValidator:
                 
             # Check recency if date is available
             if (finding.metadata.date and 
-                finding.metadata.date.year < datetime.now().year - 5):
+                finding.metadata.date.year < min_year):
                 logger.debug(f"Finding from {finding.source} rejected: too old ({finding.metadata.date.year})")
                 invalid_findings.append(finding)
                 continue
@@ -134,6 +246,53 @@ class ContentValidator:
         logger.info(f"Validation complete: {len(valid_findings)} valid, {len(invalid_findings)} invalid")
         return valid_findings, invalid_findings
     
+    def validate_findings_bulk(self, findings: List[ContentFinding], min_confidence: float = 0.5) -> Tuple[List[ContentFinding], List[ContentFinding]]:
+        """
+        Same result as validate_findings, optimized for large finding lists.
+        
+        The cheap checks (confidence, key points, recency) are gathered into
+        arrays and evaluated as one vectorized mask; validate_content only runs
+        on the findings that survive them. Falls back to validate_findings
+        when numpy is not installed.
+        
+        Args:
+            findings: List of ContentFinding objects to validate
+            min_confidence: Minimum confidence threshold
+            
+        Returns:
+            Tuple of (valid_findings, invalid_findings), both in input order
+        """
+        if np is None:
+            return self.validate_findings(findings, min_confidence)
+        
+        logger.info(f"Bulk validating {len(findings)} findings (min confidence: {min_confidence})")
+        
+        count = len(findings)
+        self._refresh_years()
+        min_year = self._current_year - 5
+        confidences = np.fromiter((f.confidence for f in findings), dtype=np.float64, count=count)
+        has_key_points = np.fromiter((bool(f.key_points) for f in findings), dtype=bool, count=count)
+        years = np.fromiter(
+            (f.metadata.date.year if f.metadata.date else min_year for f in findings),
+            dtype=np.int32, count=count
+        )
+        
+        mask = (confidences >= min_confidence) & has_key_points & (years >= min_year)
+        
+        # Content validation only on the survivors
+        for i in np.flatnonzero(mask):
+            raw_content = findings[i].raw_content
+            if raw_content and not self.validate_content(raw_content):
+                mask[i] = False
+        
+        valid_findings = []
+        invalid_findings = []
+        for finding, ok in zip(findings, mask.tolist()):
+            (valid_findings if ok else invalid_findings).append(finding)
+        
+        logger.info(f"Validation complete: {len(valid_findings)} valid, {len(invalid_findings)} invalid")
+        return valid_findings, invalid_findings
+    
     def intelligent_truncate(self, text: str, max_length: int) -> str:
         """
         Intelligently truncate text to a maximum length.
@@ -150,11 +309,12 @@ class ContentValidator:
             
         # Try to truncate at sentence boundary
         truncated = text[:max_length]
-        last_sentence_end = max(
-            truncated.rfind('.'), 
-            truncated.rfind('!'), 
-            truncated.rfind('?')
-        )
+        # One translate + one rfind instead of an rfind per terminator
+        buf = truncated.encode('utf-8')
+        last_sentence_end = buf.translate(_SENTENCE_END_TBL).rfind(b'\x01')
+        if last_sentence_end > 0 and not truncated.isascii():
+            # Terminators are single bytes, so the kept slice decodes cleanly
+            last_sentence_end = len(buf[:last_sentence_end].decode('utf-8'))
         
         if last_sentence_end > max_length * 0.7:  # If we can keep at least 70% of the text
             return text[:last_sentence_end + 1] + '...'